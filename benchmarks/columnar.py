@@ -0,0 +1,52 @@
+# This file is part of pyciv.
+#
+# pyciv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyciv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyciv.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Compares the time and the memory kept when the tables of a large synthetic
+saved game are stored as lists of dictionaries and by column.
+
+Run from the repository root with: python -m benchmarks.columnar
+"""
+
+import tempfile
+from pathlib import Path
+
+from freeciv.secfile import DescentParser
+
+from .common import best_of, retained_memory, write_savegame
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        write_savegame(root / "game.sav", units=10000)
+
+        for columnar in (False, True):
+
+            def load():
+                return DescentParser.load(
+                    "game.sav", [root], scanner="regex", columnar=columnar
+                )
+
+            elapsed = best_of(load)
+            kept, _ = retained_memory(load)
+            print(
+                f"columnar={columnar!s:<5}: {elapsed * 1e3:7.1f} ms, "
+                f"{kept / 1e6:6.1f} MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
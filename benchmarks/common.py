@@ -0,0 +1,82 @@
+# This file is part of pyciv.
+#
+# pyciv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyciv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyciv.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Helpers shared by the benchmarks.
+"""
+
+import gc
+import time
+import tracemalloc
+
+
+def write_savegame(path, players=8, units=2000, map_rows=200):
+    """
+    Writes a synthetic file shaped like a Freeciv saved game: a few small
+    sections, a large map section and one section per player with big unit
+    and city tables.
+    """
+    with open(path, "w") as f:
+        f.write('[datafile]\ndescription="Synthetic savegame"\noptions="+version3"\n')
+        f.write("\n[game]\nturn=120\nyear=1850\nrandseed=12345\n")
+        f.write("\n[map]\n")
+        for row in range(map_rows):
+            f.write(f't{row:04}="{"adgh:+" * 40}"\n')
+        for player in range(players):
+            f.write(f'\n[player{player}]\nname="Player {player}"\n')
+            f.write('nation="Barbarian"\ngold=1234\n')
+            f.write(f"ncities={units // 10}\n")
+            f.write('c={"x","y","id","owner","name","size","food_stock"\n')
+            for city in range(units // 10):
+                f.write(
+                    f'{city % 80},{city // 80},{city},{player},"City {city}",5,12\n'
+                )
+            f.write("}\n")
+            f.write(f"nunits={units}\n")
+            f.write(
+                'u={"x","y","id","owner","type_by_name","hp","veteran","done_moving"\n'
+            )
+            for unit in range(units):
+                f.write(
+                    f'{unit % 80},{unit // 80},{unit},{player},"Warriors",10,0,FALSE\n'
+                )
+            f.write("}\n")
+
+
+def best_of(fn, repeat=3):
+    """
+    Runs fn a few times and returns the fastest wall-clock time in seconds.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def retained_memory(fn):
+    """
+    Returns the memory still allocated by the result of fn.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = fn()
+        gc.collect()
+        return tracemalloc.get_traced_memory()[0], result
+    finally:
+        tracemalloc.stop()
@@ -0,0 +1,63 @@
+# This file is part of pyciv.
+#
+# pyciv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyciv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyciv.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Compares the memory kept by many similarly shaped sections stored as Section
+and as CompactSection.
+
+Run from the repository root with: python -m benchmarks.compact
+"""
+
+import tempfile
+from pathlib import Path
+
+from freeciv.secfile import DescentParser
+
+from .common import best_of, retained_memory
+
+
+def write_sections(path, count=20000):
+    """
+    Writes count sections with the same plain and qualified names.
+    """
+    with open(path, "w") as f:
+        for i in range(count):
+            f.write(f'[unit_{i}]\nname = "Unit {i}"\nclass = "Land"\n')
+            f.write(f"attack = {i % 10}\ndefense = 1\nhitpoints = 10\n")
+            f.write("veteran.power_fact = 100, 150\nveteran.move_bonus = 0, 1\n")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        write_sections(root / "units.spec")
+
+        for compact in (False, True):
+
+            def load():
+                return DescentParser.load(
+                    "units.spec", [root], scanner="regex", compact=compact
+                )
+
+            elapsed = best_of(load)
+            kept, _ = retained_memory(load)
+            print(
+                f"compact={compact!s:<5}: {elapsed * 1e3:7.1f} ms, "
+                f"{kept / 1e6:6.1f} MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
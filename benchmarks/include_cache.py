@@ -0,0 +1,74 @@
+# This file is part of pyciv.
+#
+# pyciv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyciv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyciv.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Measures the include cache when several rulesets include the same files, as
+the Longturn rulesets do with nations and helpdata. Each ruleset is parsed
+with and without the cache.
+
+Run from the repository root with: python -m benchmarks.include_cache
+"""
+
+import tempfile
+from pathlib import Path
+
+from benchmarks.common import best_of
+from freeciv.secfile import SpecParser, include_cache
+
+RULESETS = 10
+
+
+def make_tree(root, nations=300):
+    """
+    Writes RULESETS main files including the same set of nation files.
+    """
+    lines = []
+    for i in range(nations):
+        (root / f"nation{i}.spec").write_text(
+            f'[nation_{i}]\nname = _("Nation {i}")\nplural = _("Nations {i}")\n'
+            f'flag = "f{i}", "f"\nleaders = {{"name", "sex"\n'
+            + "".join(f'"Leader {j}", "Male"\n' for j in range(10))
+            + "}\n"
+        )
+        lines.append(f'*include "nation{i}.spec"')
+    for ruleset in range(RULESETS):
+        (root / f"ruleset{ruleset}.spec").write_text("\n".join(lines) + "\n")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_tree(root)
+
+        def load_all():
+            for ruleset in range(RULESETS):
+                SpecParser.load(f"ruleset{ruleset}.spec", [root], scanner="regex")
+
+        maxsize = include_cache.maxsize
+        include_cache.maxsize = 0
+        uncached = best_of(load_all)
+        include_cache.maxsize = maxsize
+
+        include_cache.clear()
+        cached = best_of(load_all)
+        info = include_cache.cache_info()
+
+    print(f"{RULESETS} rulesets without cache: {uncached * 1e3:8.1f} ms")
+    print(f"{RULESETS} rulesets with cache:    {cached * 1e3:8.1f} ms")
+    print(f"hits: {info.hits}, misses: {info.misses}, entries: {info.currsize}")
+
+
+if __name__ == "__main__":
+    main()
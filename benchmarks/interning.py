@@ -0,0 +1,54 @@
+# This file is part of pyciv.
+#
+# pyciv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyciv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyciv.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Measures the memory kept by the sections of a large synthetic saved game,
+with and without interning of names. Interning is disabled by replacing
+sys.intern for the duration of the parse.
+
+Run from the repository root with: python -m benchmarks.interning
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+from freeciv.secfile import DescentParser
+
+from .common import retained_memory, write_savegame
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        write_savegame(root / "game.sav", units=10000)
+
+        def load():
+            return DescentParser.load("game.sav", [root], scanner="regex")
+
+        intern = sys.intern
+        sys.intern = lambda string: string
+        try:
+            before, _ = retained_memory(load)
+        finally:
+            sys.intern = intern
+        after, _ = retained_memory(load)
+
+    print(f"without interning: {before / 1e6:7.1f} MB")
+    print(f"with interning:    {after / 1e6:7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
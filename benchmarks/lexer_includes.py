@@ -0,0 +1,80 @@
+# This file is part of pyciv.
+#
+# pyciv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyciv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyciv.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Measures the cost of opening files in SpecLexer as the number of *include
+statements grows. The time spent building PLY lexers should stay constant
+(one build per class) while the total grows with the amount of input.
+
+Run from the repository root with: python -m benchmarks.lexer_includes
+"""
+
+import tempfile
+import time
+from pathlib import Path
+
+import freeciv.secfile.lexer
+from freeciv.secfile import SpecLexer
+
+
+def make_tree(root, count):
+    """
+    Writes a main file including count small files, in the spirit of
+    nations.ruleset.
+    """
+    lines = []
+    for i in range(count):
+        (root / f"nation{i}.spec").write_text(
+            f'[nation_{i}]\nname = "Nation {i}"\nflag = "f{i}", "f"\n'
+        )
+        lines.append(f'*include "nation{i}.spec"')
+    (root / "main.spec").write_text("\n".join(lines) + "\n")
+
+
+def main():
+    build_time = 0.0
+    builds = 0
+    lex = freeciv.secfile.lexer.lex
+
+    def timed_lex(*args, **kwargs):
+        nonlocal build_time, builds
+        start = time.perf_counter()
+        try:
+            return lex(*args, **kwargs)
+        finally:
+            build_time += time.perf_counter() - start
+            builds += 1
+
+    freeciv.secfile.lexer.lex = timed_lex
+
+    print(f"{'includes':>8} {'builds':>6} {'build ms':>9} {'total ms':>9}")
+    for count in (1, 10, 100, 500):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            make_tree(root, count)
+
+            build_time, builds = 0.0, 0
+            SpecLexer._template = None  # Measure a cold start
+            start = time.perf_counter()
+            lexer = SpecLexer("main.spec", [root])
+            while lexer.token():
+                pass
+            total = time.perf_counter() - start
+
+        print(f"{count:8} {builds:6} {build_time * 1e3:9.2f} {total * 1e3:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
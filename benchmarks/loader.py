@@ -0,0 +1,207 @@
+# This file is part of pyciv.
+#
+# pyciv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyciv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyciv.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Measures the time needed to turn parsed sections into ruleset objects, for
+synthetic effects and units files shaped like the ones of a large ruleset,
+with and without the trusted mode, and in trusted mode followed by the
+separate validation pass. Parsing is not included. The trusted mode only
+shows a clear difference with typeguard 2.
+
+The compiled converters of the loader are also compared with a copy of the
+loader they replaced, which looked up type hints and called typeguard for
+every value it converted.
+
+Run from the repository root with: python -m benchmarks.loader
+"""
+
+import dataclasses
+import logging
+import tempfile
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import get_args, get_origin, get_type_hints
+
+from freeciv.effects import Effect, EffectsSettings
+from freeciv.secfile import (
+    ColumnTable,
+    SpecParser,
+    read_sections,
+    set_trusted,
+    validate,
+)
+from freeciv.secfile.loader import TypeCheckError, check_type, typeguard_version
+from freeciv.units import UnitsSettings, UnitType
+
+from .common import best_of
+
+
+def write_effects(path, effects=3000):
+    """
+    Writes a file with many effects, each with a few requirements.
+    """
+    with open(path, "w") as f:
+        for i in range(effects):
+            f.write(f'\n[effect_{i}]\ntype = "Output_Bonus"\nvalue = {i % 50}\n')
+            f.write('reqs =\n    { "type", "name", "range", "present"\n')
+            f.write('      "Building", "Factory", "City", TRUE\n')
+            f.write('      "OutputType", "Shield", "Local", TRUE\n')
+            f.write('      "Gov", "Anarchy", "Player", FALSE\n    }\n')
+
+
+def write_units(path, units=300):
+    """
+    Writes a file with unit classes and many unit types.
+    """
+    with open(path, "w") as f:
+        f.write('[veteran_system]\nveteran_names = _("green"), _("veteran")\n')
+        f.write("veteran_power_fact = 100, 150\nveteran_base_raise_chance = 50, 0\n")
+        f.write("veteran_work_raise_chance = 0, 0\nveteran_move_bonus = 0, 0\n")
+        f.write('\n[unitclass_land]\nname = _("Land")\nmin_speed = 1\n')
+        f.write('hp_loss_pct = 0\nflags = "TerrainSpeed", "CanOccupyCity"\n')
+        for i in range(units):
+            f.write(f'\n[unit_{i}]\nname = _("Unit {i}")\nclass = "Land"\n')
+            f.write('tech_req = "Bronze Working"\nobsolete_by = "None"\n')
+            f.write('graphic = "u.warriors"\ngraphic_alt = "-"\n')
+            f.write('sound_move = "m_warriors"\nsound_move_alt = "m_generic"\n')
+            f.write('sound_fight = "f_warriors"\nsound_fight_alt = "f_generic"\n')
+            f.write("build_cost = 10\npop_cost = 0\nattack = 1\ndefense = 1\n")
+            f.write("hitpoints = 10\nfirepower = 1\nmove_rate = 1\n")
+            f.write("vision_radius_sq = 2\ntransport_cap = 0\nfuel = 0\n")
+            f.write("uk_happy = 1\nuk_shield = 1\nuk_food = 0\nuk_gold = 0\n")
+            f.write('flags = "Capturer", "NonMil"\nroles = "DefendOk"\n')
+            f.write('bonuses = { "flag", "type", "value"\n')
+            f.write('  "Horse", "DefenseMultiplier", 1\n}\n')
+            f.write('helptext = _("A unit."), _("Another paragraph.")\n')
+
+
+def _reflection_list(value, target_class):
+    """
+    Coerces a value to a list like the loader used to.
+    """
+    if type(value) == list or isinstance(value, ColumnTable):
+        return [_reflection_instance(item, target_class) for item in value]
+    elif value == "":
+        return []
+    else:
+        return [_reflection_instance(value, target_class)]
+
+
+def _reflection_instance(value, target_class, name=""):
+    """
+    Converts a value like the loader used to, looking up the type hints of
+    classes and trying typeguard every time.
+    """
+    if target_class in (bool, dict, float, int, str):
+        return target_class(value)
+    elif hasattr(target_class, "wrapped"):
+        # NamedReference
+        return str(value)
+    elif hasattr(target_class, "__origin__"):
+        origin, args = get_origin(target_class), get_args(target_class)
+        if origin == list:
+            return _reflection_list(value, args[0])
+        elif origin == set:
+            return set(_reflection_list(value, args[0]))
+
+    try:
+        if typeguard_version == 3:
+            check_type(value, target_class)
+        else:
+            check_type(name, value, target_class)
+        return value
+    except TypeCheckError:
+        pass
+
+    hints = get_type_hints(target_class)
+    unknown = value.keys() - hints.keys()
+    if unknown:
+        fields = '", "'.join(unknown)
+        raise ValueError(f'Type {target_class.__name__} has no field called "{fields}"')
+
+    # The old loader read the defaults from class attributes, which classes
+    # with slots don't have
+    args = {
+        field.name: field.default
+        for field in dataclasses.fields(target_class)
+        if field.default is not dataclasses.MISSING
+    }
+    args.update(
+        {
+            name: _reflection_instance(val, hints[name], name)
+            for name, val in value.items()
+        }
+    )
+    return target_class(**args)
+
+
+def reflection_read_sections(section_class, sections):
+    """
+    Reads sections like read_sections() used to, before the converters were
+    compiled once per class.
+    """
+    result = []
+    for section in sections:
+        if section_class._section_regex.match(section.name):
+            logging.debug(f'Processing section "%s"', section.name)
+            # Unused, but computed for every section
+            fields = list(
+                filter(lambda name: not name.startswith("_"), dir(section_class))
+            )
+            default_values = {name: getattr(section_class, name) for name in fields}
+            annotations = section_class.__annotations__
+
+            if hasattr(section_class, "_rewrite_fn"):
+                if not isinstance(section, MutableMapping):
+                    section = dict(section)
+                section = section_class._rewrite_fn(section)
+
+            result.append(_reflection_instance(section, section_class))
+    return result
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        write_effects(root / "effects.ruleset")
+        write_units(root / "units.ruleset")
+        effects = SpecParser.load("effects.ruleset", [root])
+        units = SpecParser.load("units.ruleset", [root])
+
+        for loader, read in (
+            ("reflection", reflection_read_sections),
+            ("compiled", read_sections),
+        ):
+            elapsed = best_of(lambda: read(Effect, effects))
+            print(f"{loader:<10} effects: {elapsed * 1e3:7.1f} ms")
+            elapsed = best_of(lambda: read(UnitType, units))
+            print(f"{loader:<10} units  : {elapsed * 1e3:7.1f} ms")
+
+        for trusted in (False, True):
+            set_trusted(trusted)
+            elapsed = best_of(lambda: EffectsSettings(effects))
+            print(f"trusted={trusted!s:<5} effects: {elapsed * 1e3:7.1f} ms")
+            elapsed = best_of(lambda: UnitsSettings(units))
+            print(f"trusted={trusted!s:<5} units  : {elapsed * 1e3:7.1f} ms")
+
+        elapsed = best_of(lambda: validate(EffectsSettings(effects)))
+        print(f"trusted+validate effects: {elapsed * 1e3:7.1f} ms")
+        elapsed = best_of(lambda: validate(UnitsSettings(units)))
+        print(f"trusted+validate units  : {elapsed * 1e3:7.1f} ms")
+        set_trusted(False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# This file is part of pyciv.
+#
+# pyciv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyciv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyciv.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Compares the peak Python memory used when parsing a synthetic saved game from
+a decoded string and from a memory map. Memory-mapped pages belong to the OS
+page cache and are not counted.
+
+Run from the repository root with: python -m benchmarks.memory_map
+"""
+
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from freeciv.secfile import DescentParser
+
+from .common import write_savegame
+
+
+def peak_memory(fn):
+    tracemalloc.start()
+    try:
+        result = fn()
+        return tracemalloc.get_traced_memory()[1], result
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        write_savegame(root / "game.sav", units=10000)
+        size = (root / "game.sav").stat().st_size
+        print(f"Input: {size / 1e6:.1f} MB")
+
+        for memory_map in (False, True):
+            # Only keep one section to show the cost of the input itself
+            peak, _ = peak_memory(
+                lambda: DescentParser.load(
+                    "game.sav",
+                    [root],
+                    scanner="regex",
+                    memory_map=memory_map,
+                    sections="game$",
+                )
+            )
+            print(f"memory_map={memory_map!s:<5}: peak {peak / 1e6:6.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
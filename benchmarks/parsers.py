@@ -0,0 +1,66 @@
+# This file is part of pyciv.
+#
+# pyciv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyciv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyciv.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Compares SpecParser and DescentParser with both scanners. The results are
+checked to be identical before timing.
+
+Run from the repository root with: python -m benchmarks.parsers [-p PATH FILE...]
+Without arguments, a synthetic saved game is used.
+"""
+
+import argparse
+import tempfile
+from pathlib import Path
+
+from freeciv.secfile import DescentParser, SpecParser
+
+from .common import best_of, write_savegame
+
+
+def compare(files, data_path):
+    for name in files:
+        print(name)
+        expected = SpecParser.load(name, data_path)
+        baseline = None
+        for parser in (SpecParser, DescentParser):
+            for scanner in ("ply", "regex"):
+                if parser.load(name, data_path, scanner=scanner) != expected:
+                    raise AssertionError(f"{parser.__name__} differs on {name}")
+                elapsed = best_of(lambda: parser.load(name, data_path, scanner=scanner))
+                baseline = baseline or elapsed
+                print(
+                    f"  {parser.__name__:>13} {scanner:>5}: {elapsed:6.3f} s "
+                    f"(x{baseline / elapsed:.1f})"
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-p", "--path", action="append", help="data path entry")
+    parser.add_argument("files", nargs="*", help="files to parse")
+    args = parser.parse_args()
+
+    if args.files:
+        compare(args.files, args.path or ["."])
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_savegame(Path(tmp) / "game.sav")
+        compare(["game.sav"], [tmp])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# This file is part of pyciv.
+#
+# pyciv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyciv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyciv.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Checks that parsing long lists and tables scales linearly with their length.
+The time per element should stay roughly constant; with --check, the script
+fails if it grows by more than a factor of 3 between the smallest and largest
+sizes.
+
+Run from the repository root with: python -m benchmarks.scaling [--check]
+"""
+
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+from freeciv.secfile import SpecParser
+
+from .common import best_of
+
+SIZES = (10_000, 100_000, 1_000_000)
+
+
+def write_list(path, count):
+    with open(path, "w") as f:
+        f.write("[vector]\nvalues = ")
+        f.write(", ".join(str(i % 100) for i in range(count)))
+        f.write("\n")
+
+
+def write_table(path, count):
+    with open(path, "w") as f:
+        f.write('[table]\nrows = { "a", "b"\n')
+        for i in range(count // 2):
+            f.write(f"{i}, {i}\n")
+        f.write("}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parser scaling benchmark")
+    parser.add_argument("--check", action="store_true", help="fail when not linear")
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        for kind, writer in (("list", write_list), ("table", write_table)):
+            per_element = []
+            for count in SIZES:
+                writer(root / "test.spec", count)
+                elapsed = best_of(
+                    lambda: SpecParser.load("test.spec", [root], scanner="regex"),
+                    repeat=1,
+                )
+                per_element.append(elapsed / count)
+                print(
+                    f"{kind:>5} {count:>9}: {elapsed:7.3f} s, "
+                    f"{per_element[-1] * 1e6:.2f} us/element"
+                )
+            if per_element[-1] > 3 * per_element[0]:
+                print(f"{kind}: time per element grows with the length")
+                failed = True
+
+    if args.check and failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
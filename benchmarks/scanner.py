@@ -0,0 +1,54 @@
+# This file is part of pyciv.
+#
+# pyciv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyciv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyciv.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Compares the PLY and regex scanners on a synthetic saved game, first for
+tokenizing alone and then for a full parse.
+
+Run from the repository root with: python -m benchmarks.scanner
+"""
+
+import tempfile
+from pathlib import Path
+
+from freeciv.secfile import SpecLexer, SpecParser
+
+from .common import best_of, write_savegame
+
+
+def drain(lexer):
+    while lexer.token():
+        pass
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        write_savegame(root / "game.sav")
+        size = (root / "game.sav").stat().st_size
+        print(f"Input: {size / 1e6:.1f} MB")
+
+        for scanner in ("ply", "regex"):
+            lex_time = best_of(
+                lambda: drain(SpecLexer("game.sav", [root], scanner=scanner))
+            )
+            parse_time = best_of(
+                lambda: SpecParser.load("game.sav", [root], scanner=scanner)
+            )
+            print(f"{scanner:>6}: lex {lex_time:6.3f} s, parse {parse_time:6.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# This file is part of pyciv.
+#
+# pyciv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyciv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyciv.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Compares loading one section of a synthetic savegame with a selective parse
+and through a section index. Lookups through the index should only depend on
+the size of the section.
+
+Run from the repository root with: python -m benchmarks.section_index
+"""
+
+import tempfile
+from pathlib import Path
+
+from benchmarks.common import best_of, write_savegame
+from freeciv.secfile import DescentParser, SectionIndex
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        write_savegame(root / "savegame.spec")
+
+        build = best_of(lambda: SectionIndex.build("savegame.spec", [root]))
+        print(f"{'build index':>20} {build * 1e3:8.1f} ms")
+
+        for name in ("game", "player7"):
+            selective = best_of(
+                lambda: DescentParser.load(
+                    "savegame.spec", [root], scanner="regex", sections=name
+                )
+            )
+            indexed = best_of(
+                lambda: DescentParser.load_section("savegame.spec", [root], name)
+            )
+            print(f"{name + ' selective':>20} {selective * 1e3:8.1f} ms")
+            print(f"{name + ' indexed':>20} {indexed * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
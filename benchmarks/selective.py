@@ -0,0 +1,51 @@
+# This file is part of pyciv.
+#
+# pyciv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyciv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyciv.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Measures section-selective parsing on a synthetic saved game.
+
+Run from the repository root with: python -m benchmarks.selective
+"""
+
+import tempfile
+from pathlib import Path
+
+from freeciv.secfile import SpecParser
+
+from .common import best_of, write_savegame
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        write_savegame(root / "game.sav")
+
+        for scanner in ("ply", "regex"):
+            baseline = None
+            for sections in (None, "player0$", "game$"):
+                elapsed = best_of(
+                    lambda: SpecParser.load(
+                        "game.sav", [root], scanner=scanner, sections=sections
+                    )
+                )
+                baseline = baseline or elapsed
+                print(
+                    f"{scanner:>5} sections={sections!s:<10} {elapsed:6.3f} s "
+                    f"(x{baseline / elapsed:.1f})"
+                )
+
+
+if __name__ == "__main__":
+    main()
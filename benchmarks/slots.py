@@ -0,0 +1,101 @@
+# This file is part of pyciv.
+#
+# pyciv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyciv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyciv.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Measures the memory kept by the objects loaded from synthetic effects and
+units files, the largest parts of a ruleset. The same objects are then copied
+to classes without slots, like the entity classes used to be, to show the
+difference.
+
+Run from the repository root with: python -m benchmarks.slots
+"""
+
+import dataclasses
+import tempfile
+from pathlib import Path
+
+from freeciv.effects import EffectsSettings
+from freeciv.secfile import SpecParser
+from freeciv.units import UnitsSettings
+
+from .common import retained_memory
+from .loader import write_effects, write_units
+
+# Copies of the slots dataclasses that store their fields in a __dict__
+_plain_classes = {}
+
+
+def _plain_class(cls):
+    """
+    Returns a class like cls, but without slots.
+    """
+    plain = _plain_classes.get(cls)
+    if plain is None:
+        plain = _plain_classes[cls] = type(cls.__name__, (), {})
+    return plain
+
+
+def without_slots(value, copies):
+    """
+    Returns a copy of value where the instances of slots dataclasses are
+    replaced by instances of a class without slots, with the same fields.
+    Other values are shared with the original. copies maps the ids of the
+    objects already copied to their copy, so shared objects stay shared.
+    """
+    copy = copies.get(id(value))
+    if copy is not None:
+        return copy
+
+    if isinstance(value, list):
+        copy = [without_slots(item, copies) for item in value]
+    elif isinstance(value, dict):
+        copy = {key: without_slots(item, copies) for key, item in value.items()}
+    elif dataclasses.is_dataclass(value) and hasattr(type(value), "__slots__"):
+        copy = object.__new__(_plain_class(type(value)))
+        # Set the fields in order, like the __init__ of a dataclass would
+        for field in dataclasses.fields(value):
+            setattr(copy, field.name, without_slots(getattr(value, field.name), copies))
+    elif isinstance(value, UnitsSettings):
+        for name, item in vars(value).items():
+            setattr(value, name, without_slots(item, copies))
+        copy = value
+    else:
+        return value
+
+    copies[id(value)] = copy
+    return copy
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        write_effects(root / "effects.ruleset")
+        write_units(root / "units.ruleset")
+
+        for name, settings in (
+            ("effects", EffectsSettings),
+            ("units", UnitsSettings),
+        ):
+            path = root / f"{name}.ruleset"
+            kept, _ = retained_memory(lambda: settings(SpecParser.load(path, [])))
+            print(f"{name:<7}: slots    {kept / 1e6:6.2f} MB")
+            kept, _ = retained_memory(
+                lambda: without_slots(settings(SpecParser.load(path, [])), {})
+            )
+            print(f"{name:<7}: no slots {kept / 1e6:6.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
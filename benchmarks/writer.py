@@ -0,0 +1,54 @@
+# This file is part of pyciv.
+#
+# pyciv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyciv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyciv.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Compares the time needed to read a large synthetic saved game and to write
+it back, as plain text and compressed.
+
+Run from the repository root with: python -m benchmarks.writer
+"""
+
+import tempfile
+from pathlib import Path
+
+from freeciv.secfile import DescentParser, SpecWriter
+
+from .common import best_of, write_savegame
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        write_savegame(root / "game.sav", units=10000)
+
+        sections = None
+
+        def read():
+            nonlocal sections
+            sections = DescentParser.load("game.sav", [root], scanner="regex")
+
+        print(f"read            : {best_of(read) * 1e3:7.1f} ms")
+
+        for name in ("out.sav", "out.sav.gz"):
+
+            def write():
+                with SpecWriter(root / name) as writer:
+                    writer.write_all(sections)
+
+            print(f"write {name:<10}: {best_of(write) * 1e3:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,9 @@
 from dataclasses import dataclass, field
 from warnings import warn
 
-from typeguard import typechecked
-
 from .effects import Requirement
 from .science import Advance
-from .secfile.loader import read_named_sections, rewrite, section
+from .secfile.loader import read_named_sections, rewrite, section, typechecked
 
 
 def building_compat(values):
@@ -24,7 +22,7 @@ def building_compat(values):
 @rewrite(building_compat)
 @section("building_.+")
 @typechecked
-@dataclass
+@dataclass(slots=True)
 class Building:
     name: str
     genus: str
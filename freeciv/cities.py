@@ -2,11 +2,9 @@ import re
 from dataclasses import dataclass, field
 from typing import Literal, Union
 
-from typeguard import typechecked
-
 from freeciv.effects import Requirement
 
-from .secfile.loader import read_section, section
+from .secfile.loader import SectionRouter, section, typechecked
 
 
 @section("parameters")
@@ -111,10 +109,16 @@ class CityMissingUnitUpkeepData:
     shield_wipe_help_rst: str = "? helptext needs help ?"
 
 
+_city_router = SectionRouter(
+    [CityParametersData, CityCitizenData, CityMissingUnitUpkeepData]
+)
+
+
 class CitySettings:
     def __init__(self, sections):
-        self.parameters = read_section(CityParametersData, sections)
-        self.citizens = read_section(CityCitizenData, sections, missing_ok=True)
-        self.missing_unit_upkeep = read_section(
-            CityMissingUnitUpkeepData, sections, missing_ok=True
+        routed = _city_router.route(sections)
+        self.parameters = routed.read_section(CityParametersData)
+        self.citizens = routed.read_section(CityCitizenData, missing_ok=True)
+        self.missing_unit_upkeep = routed.read_section(
+            CityMissingUnitUpkeepData, missing_ok=True
         )
@@ -1,13 +1,11 @@
 from dataclasses import dataclass, field
 
-from typeguard import typechecked
-
-from .secfile.loader import read_sections, rename, section
+from .secfile.loader import read_sections, rename, section, typechecked
 
 
 # FIXME Used in other places, move?
 @typechecked
-@dataclass
+@dataclass(slots=True)
 class Requirement:
     type: str
     name: str
@@ -33,13 +31,13 @@ class Requirement:
             raise TypeError(
                 "Both negated and present were provided (mixing 2.5 and 2.6 syntax)"
             )
-        del self.negated
+        self.negated = None
 
 
 @rename(name="type")
 @section("effect_.+")
 @typechecked
-@dataclass
+@dataclass(slots=True)
 class Effect:
     value: int
     multiplier: str = None
@@ -56,7 +54,7 @@ class Effect:
             for nreq in self.nreqs:
                 nreq.present = False
                 self.reqs.append(nreq)
-        del self.nreqs
+        self.nreqs = None
 
 
 def EffectsSettings(sections):
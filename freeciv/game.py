@@ -2,11 +2,9 @@ import re
 from dataclasses import dataclass, field
 from typing import Literal, Union
 
-from typeguard import typechecked
-
 from freeciv.effects import Requirement
 
-from .secfile.loader import read_section, read_sections, section
+from .secfile.loader import SectionRouter, section, typechecked
 
 
 @section("datafile")
@@ -470,7 +468,7 @@ class ActionsData:
 
 @section("actionenabler_.+")
 @typechecked
-@dataclass
+@dataclass(slots=True)
 class ActionEnabler:
     action: str
     name: str = None
@@ -591,23 +589,48 @@ class Settings:
     set: list[Setting] = field(default_factory=list)
 
 
+_game_router = SectionRouter(
+    [
+        AboutData,
+        ActionsData,
+        ActionEnabler,
+        AutoAttackData,
+        BordersData,
+        CalendarData,
+        CivStyleData,
+        CombatRulesData,
+        CultureData,
+        DataFileHeader,
+        IllnessData,
+        InciteCostData,
+        MusicsetData,
+        OptionsData,
+        ResearchData,
+        Settings,
+        SoundsetData,
+        TilesetData,
+    ]
+)
+
+
 class GameSettings:
     def __init__(self, sections):
-        self.about = read_section(AboutData, sections)
-        self.actions = read_section(ActionsData, sections, missing_ok=True)
-        self.action_enablers = read_sections(ActionEnabler, sections)
-        self.auto_attack = read_section(AutoAttackData, sections, missing_ok=True)
-        self.borders = read_section(BordersData, sections)
-        self.calendar = read_section(CalendarData, sections)
-        self.civ_style = read_section(CivStyleData, sections)
-        self.combat_rules = read_section(CombatRulesData, sections)
-        self.culture = read_section(CultureData, sections, missing_ok=True)
-        self.data_file_header = read_section(DataFileHeader, sections, missing_ok=True)
-        self.illness = read_section(IllnessData, sections)
-        self.incite_cost = read_section(InciteCostData, sections)
-        self.musicset = read_section(MusicsetData, sections, missing_ok=True)
-        self.options = read_section(OptionsData, sections)
-        self.research = read_section(ResearchData, sections)
-        self.settings = read_section(Settings, sections)
-        self.soundset = read_section(SoundsetData, sections, missing_ok=True)
-        self.tileset = read_section(TilesetData, sections, missing_ok=True)
+        routed = _game_router.route(sections)
+        self.about = routed.read_section(AboutData)
+        self.actions = routed.read_section(ActionsData, missing_ok=True)
+        self.action_enablers = routed.read_sections(ActionEnabler)
+        self.auto_attack = routed.read_section(AutoAttackData, missing_ok=True)
+        self.borders = routed.read_section(BordersData)
+        self.calendar = routed.read_section(CalendarData)
+        self.civ_style = routed.read_section(CivStyleData)
+        self.combat_rules = routed.read_section(CombatRulesData)
+        self.culture = routed.read_section(CultureData, missing_ok=True)
+        self.data_file_header = routed.read_section(DataFileHeader, missing_ok=True)
+        self.illness = routed.read_section(IllnessData)
+        self.incite_cost = routed.read_section(InciteCostData)
+        self.musicset = routed.read_section(MusicsetData, missing_ok=True)
+        self.options = routed.read_section(OptionsData)
+        self.research = routed.read_section(ResearchData)
+        self.settings = routed.read_section(Settings)
+        self.soundset = routed.read_section(SoundsetData, missing_ok=True)
+        self.tileset = routed.read_section(TilesetData, missing_ok=True)
@@ -1,11 +1,9 @@
 from dataclasses import dataclass, field
 from warnings import warn
 
-from typeguard import typechecked
-
 from freeciv.effects import Requirement
 
-from .secfile.loader import read_named_sections, read_section, section
+from .secfile.loader import SectionRouter, section, typechecked
 
 
 @section("governments")
@@ -17,7 +15,7 @@ class GovernmentData:
 
 @section("government_.+")
 @typechecked
-@dataclass
+@dataclass(slots=True)
 class Government:
     name: str
     graphic: str
@@ -36,7 +34,11 @@ class Government:
             self.helptext = "\n\n".join(self.helptext)
 
 
+_government_router = SectionRouter([GovernmentData, Government])
+
+
 class GovernmentSettings:
     def __init__(self, sections):
-        self.government_parms = read_section(GovernmentData, sections)
-        self.governments = read_named_sections(Government, sections)
+        routed = _government_router.route(sections)
+        self.government_parms = routed.read_section(GovernmentData)
+        self.governments = routed.read_named_sections(Government)
@@ -1,6 +1,8 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 # SPDX-FileCopyrightText: 2022 Louis Moureaux <m_louis30@yahoo.com>
 
+import asyncio
+from contextvars import copy_context
 from typing import get_args, get_type_hints
 from warnings import warn
 
@@ -10,7 +12,7 @@ from .effects import Effect, EffectsSettings
 from .game import GameSettings
 from .governments import GovernmentSettings
 from .science import Advance, ScienceSettings, calculate_cost
-from .secfile import SpecParser
+from .secfile import DataPath, SpecParser, parse
 from .units import UnitClass, UnitsSettings, UnitType, load_veteran_levels
 
 __all__ = ["Ruleset"]
@@ -24,39 +26,92 @@ class Ruleset:
     name: str
 
     buildings: BuildingsSettings
+    cities: CitySettings
     effects: list[Effect]
     game: GameSettings
     techs: ScienceSettings
     units: UnitsSettings
     governments: GovernmentSettings
 
-    def __init__(self, name, path):
+    def __init__(self, name, path, *, workers=1):
         """
-        Reads the ruleset called `name` under the data `path`.
+        Reads the ruleset called `name` under the data `path`. The files are
+        parsed by `workers` processes (see SpecParser.load_many).
         """
+        # All files are looked up in the same directories
+        path = DataPath.of(path)
 
-        self.name = name
-
-        sections = SpecParser.load(f"{name}/buildings.ruleset", path)
-        self.buildings = BuildingsSettings(sections)
-
-        sections = SpecParser.load(f"{name}/cities.ruleset", path)
-        self.cities = CitySettings(sections)
-
-        sections = SpecParser.load(f"{name}/effects.ruleset", path)
-        self.effects = EffectsSettings(sections)
+        files = self._files(name)
+        sections = SpecParser.load_many(files.values(), path, workers=workers)
+        self._build(name, {kind: sections[file] for kind, file in files.items()})
 
-        sections = SpecParser.load(f"{name}/game.ruleset", path)
-        self.game = GameSettings(sections)
+    @classmethod
+    async def aload(cls, name, path, *, executor=None):
+        """
+        Reads a ruleset like the constructor without blocking the event loop.
+        Files are parsed concurrently in the executor, by default the one of
+        the loop. Cancelling the task cancels the files not parsed yet.
+        """
+        # Executors don't propagate context variables, run each call in a
+        # copy of the current context to keep validating() in effect
+        loop = asyncio.get_running_loop()
+        path = DataPath.of(path)
+
+        files = cls._files(name)
+        results = await asyncio.gather(
+            *(
+                loop.run_in_executor(executor, copy_context().run, parse, file, path)
+                for file in files.values()
+            )
+        )
+        return await loop.run_in_executor(
+            executor,
+            copy_context().run,
+            cls._from_sections,
+            name,
+            dict(zip(files, results)),
+        )
+
+    @staticmethod
+    def _files(name):
+        """
+        Returns the names of the files of a ruleset, keyed by kind.
+        """
+        return {
+            kind: f"{name}/{kind}.ruleset"
+            for kind in (
+                "buildings",
+                "cities",
+                "effects",
+                "game",
+                "techs",
+                "units",
+                "governments",
+            )
+        }
 
-        sections = SpecParser.load(f"{name}/techs.ruleset", path)
-        self.techs = ScienceSettings(sections)
+    @classmethod
+    def _from_sections(cls, name, sections):
+        """
+        Creates a ruleset from parsed files. See _build().
+        """
+        ruleset = cls.__new__(cls)
+        ruleset._build(name, sections)
+        return ruleset
 
-        sections = SpecParser.load(f"{name}/units.ruleset", path)
-        self.units = UnitsSettings(sections)
+    def _build(self, name, sections):
+        """
+        Fills the ruleset from the sections of its files, keyed by kind.
+        """
+        self.name = name
 
-        sections = SpecParser.load(f"{name}/governments.ruleset", path)
-        self.governments = GovernmentSettings(sections)
+        self.buildings = BuildingsSettings(sections["buildings"])
+        self.cities = CitySettings(sections["cities"])
+        self.effects = EffectsSettings(sections["effects"])
+        self.game = GameSettings(sections["game"])
+        self.techs = ScienceSettings(sections["techs"])
+        self.units = UnitsSettings(sections["units"])
+        self.governments = GovernmentSettings(sections["governments"])
 
         # Replace NamedReference
         self._collections = {
@@ -16,9 +16,7 @@
 import re
 from dataclasses import dataclass
 
-from typeguard import typechecked
-
-from ..secfile import section
+from ..secfile.loader import section, typechecked
 
 _KNOWN_FORMAT_VERSIONS = {10: "3.0", 20: "3.1"}
 """Maps Freeciv ruleset format versions to Freeciv release versions."""
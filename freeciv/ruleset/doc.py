@@ -16,18 +16,20 @@
 import argparse
 import logging
 
-from ..secfile import SpecParser, read_section
+from ..secfile import DataPath, SpecParser, read_section
 from . import DataFileHeader
 
 _log = logging.getLogger(__name__)
 
 
-def parse_files(ruleset, data_path):
+def parse_files(ruleset, data_path, cache_dir=None, workers=1):
     """
     Parses the data file for a ruleset and returns a dict containing the section
-    data.
+    data. Parsed files are cached in cache_dir if it is given, and parsed by
+    the given number of worker processes.
     """
-    sections = dict()
+    data_path = DataPath.of(data_path)
+    files = dict()
     for name in (
         "buildings",
         "cities",
@@ -39,10 +41,8 @@ def parse_files(ruleset, data_path):
         "terrain",
         "units",
     ):
-        try:
-            _log.info("Loading %s/%s.ruleset", ruleset, name)
-            sections[name] = list(SpecParser(f"{ruleset}/{name}.ruleset", data_path))
-        except FileNotFoundError:
+        files[name] = f"{ruleset}/{name}.ruleset"
+        if data_path.find(files[name]) is None:
             # In versions <2.5, files could be omitted and would be taken from
             # the default ruleset.
             # The fallback only works if files for the corresponding version are
@@ -57,9 +57,13 @@ def parse_files(ruleset, data_path):
                 "This behavior is supported for backwards compatibility. "
                 "Use *include instead."
             )
-            sections[name] = list(SpecParser(f"default/{name}.ruleset", data_path))
+            files[name] = f"default/{name}.ruleset"
 
-    return sections
+    _log.info("Loading %s", ", ".join(files.values()))
+    sections = SpecParser.load_many(
+        files.values(), data_path, workers=workers, cache_dir=cache_dir
+    )
+    return {name: sections[file] for name, file in files.items()}
 
 
 def check_version(all_sections):
@@ -106,6 +110,20 @@ def document_ruleset():
         "-p", "--path", action="append", help="add a directory to the search path"
     )
 
+    # Parsing is the slowest part, keep the results for the next run
+    parser.add_argument(
+        "--cache-dir", type=str, help="cache parsed files in this directory"
+    )
+
+    # Parse the files in parallel
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of processes used to parse files",
+    )
+
     # Verbosity flag
     parser.add_argument(
         "-v",
@@ -122,7 +140,7 @@ def document_ruleset():
 
     # Start by parsing the files so we fail immediately if any of them is
     # missing or has a syntax error
-    sections = parse_files(args.ruleset, args.path)
+    sections = parse_files(args.ruleset, args.path, args.cache_dir, args.jobs)
 
     # Determine the Freeciv version. This needs to be done first in order to set
     # up version upgrade hooks.
@@ -2,10 +2,8 @@ import math
 from dataclasses import dataclass, field
 from warnings import warn
 
-from typeguard import typechecked
-
 from .game import ResearchData
-from .secfile.loader import NamedReference, read_named_sections, section
+from .secfile.loader import NamedReference, read_named_sections, section, typechecked
 
 
 def calculate_cost(advance, game):
@@ -52,7 +50,7 @@ def calculate_cost(advance, game):
 
 @section("advance_.+")
 @typechecked
-@dataclass
+@dataclass(slots=True)
 class Advance:
     name: str
     req1: NamedReference("Advance")
@@ -13,6 +13,23 @@
 # You should have received a copy of the GNU General Public License
 # along with pyciv.  If not, see <https://www.gnu.org/licenses/>.
 
+from .bulk import ParseError
+from .cache import include_cache
+from .compact import CompactSection
+from .datapath import DataPath
+from .descent import DescentParser
+from .index import SectionIndex
 from .lexer import SpecLexer
-from .loader import read_section, read_sections, section  # Bad names...
-from .parser import Section, SpecParser
+from .loader import (  # Bad names...
+    SectionRouter,
+    is_trusted,
+    read_section,
+    read_sections,
+    section,
+    set_trusted,
+    validate,
+    validating,
+)
+from .parser import Section, SpecParser, parse
+from .table import ColumnTable
+from .writer import SpecWriter
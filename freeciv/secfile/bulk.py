@@ -0,0 +1,142 @@
+# This file is part of pyciv.
+#
+# pyciv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyciv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyciv.  If not, see <https://www.gnu.org/licenses/>.
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .datapath import DataPath
+
+
+class ParseError(ValueError):
+    """
+    Raised by load_many() when a file cannot be parsed in a worker process. It
+    records the file that was requested (path) and, when known, the file and
+    line where the error happened, which can be an included file. The original
+    exception is its __cause__.
+
+    When files are parsed in the calling process, the original exceptions are
+    raised instead, like with load().
+    """
+
+    def __init__(self, message, path, file=None, line=None):
+        super().__init__(message, path, file, line)
+        self.message = message
+        self.path = path
+        self.file = file
+        self.line = line
+
+    def __str__(self):
+        location = self.file or self.path
+        if self.line is not None:
+            location = f"{location}:{self.line}"
+        return f"{location}: {self.message}"
+
+
+class _LogCapture(logging.Handler):
+    """
+    Internal class keeping the messages logged in a worker process so they
+    can be logged again in the parent.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append((record.name, record.levelno, record.getMessage()))
+
+
+def _position(parser):
+    """
+    Returns the file and line a parser stopped at, or (None, None).
+    """
+    if parser is None or not parser._file_stack:
+        return None, None
+    return parser._current_file(), parser._current_lexer().lineno
+
+
+def _load(parser_class, path, data_path, options):
+    """
+    Loads a file like parser_class.load(), raising ParseError on failure.
+    """
+    options = dict(options)
+    cache_dir = options.pop("cache_dir", None)
+    parser = None
+    try:
+        if cache_dir is not None:
+            # The parser is created by the cache, no position is available
+            return parser_class.load(path, data_path, cache_dir=cache_dir, **options)
+        parser = parser_class(path, data_path, **options)
+        return parser.get_all()
+    except OSError:
+        # Not a problem with the contents of the file
+        raise
+    except Exception as e:
+        raise ParseError(str(e), path, *_position(parser)) from e
+
+
+def _load_in_worker(parser_class, path, data_path, options):
+    """
+    Runs _load() in a worker process and returns its result along with the
+    messages that were logged.
+    """
+    logger = logging.getLogger(__name__.rpartition(".")[0])
+    capture = _LogCapture()
+    propagate = logger.propagate
+    logger.addHandler(capture)
+    logger.propagate = False
+    try:
+        try:
+            return _load(parser_class, path, data_path, options), capture.messages
+        except Exception as e:
+            # Keep the messages logged before the error
+            e.messages = capture.messages
+            raise
+    finally:
+        logger.removeHandler(capture)
+        logger.propagate = propagate
+
+
+def load_many(parser_class, paths, data_path, workers, options):
+    """
+    Implements load_many() for parser_class. See SpecParser.load_many().
+    """
+    paths = list(paths)
+    data_path = DataPath.of(data_path)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(paths))
+
+    if workers <= 1:
+        return {path: parser_class.load(path, data_path, **options) for path in paths}
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_load_in_worker, parser_class, path, data_path, options)
+            for path in paths
+        ]
+        for path, future in zip(paths, futures):
+            try:
+                results[path], messages = future.result()
+            except Exception as e:
+                messages = getattr(e, "messages", [])
+                executor.shutdown(cancel_futures=True)
+                raise
+            finally:
+                for name, level, message in messages:
+                    logging.getLogger(name).log(level, "%s", message)
+    return results
@@ -0,0 +1,296 @@
+# This file is part of pyciv.
+#
+# pyciv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyciv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyciv.  If not, see <https://www.gnu.org/licenses/>.
+
+import hashlib
+import logging
+import os
+import pickle
+import re
+import tempfile
+import threading
+from collections import OrderedDict, namedtuple
+
+from .scanner import StreamScanner, Token
+
+_log = logging.getLogger(__name__)
+
+# Bump when the format of cached sections changes
+_DISK_CACHE_VERSION = 1
+
+CacheInfo = namedtuple("CacheInfo", "hits misses maxsize currsize")
+
+
+def _file_version(path):
+    """
+    Returns the path, modification time and size of a file.
+    """
+    stat = os.stat(path)
+    return path, stat.st_mtime_ns, stat.st_size
+
+
+def _unchanged(versions):
+    """
+    Checks that files still have the versions returned by _file_version().
+    """
+    try:
+        return all(_file_version(version[0]) == version for version in versions)
+    except OSError:
+        return False
+
+
+def _same_strings(strings, data_path):
+    """
+    Checks that the names of the files used in string literals lead to the
+    same files in data_path. Strings is a list of (name, real path) pairs.
+    """
+    for name, path in strings:
+        full_path = data_path.find(name)
+        if full_path is None or os.path.realpath(full_path) != path:
+            return False
+    return True
+
+
+def _file_digest(path):
+    """
+    Returns the SHA-256 digest of the contents of a file.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class TokenReplay:
+    """
+    Plays back the tokens of a file stored in the IncludeCache. It can be used
+    by SpecLexer in place of a PLY lexer or a RegexScanner.
+    """
+
+    def __init__(self, tokens, lexdata, files):
+        self.lexdata = lexdata
+        self.files = files
+        self.lexpos = 0
+        self.lineno = 1
+        self._tokens = tokens
+        self._index = 0
+
+    def token(self):
+        """
+        Returns the next token, or None at the end of the file.
+        """
+        if self._index >= len(self._tokens):
+            return None
+        token = self._tokens[self._index]
+        self._index += 1
+        self.lexpos = token.lexpos
+        self.lineno = token.lineno
+        return token
+
+    def skip_section(self):
+        """
+        Skips tokens until the next section header or *include.
+        """
+        tokens = self._tokens
+        while self._index < len(tokens) and tokens[self._index].type not in (
+            "SECTION_HEADER",
+            "INCLUDE",
+        ):
+            self._index += 1
+
+
+class IncludeCache:
+    """
+    A bounded LRU cache of the tokens of included files, shared by all
+    SpecLexer instances in the process. Entries are keyed by the real path,
+    modification time and size of the file, so a modified file is read again.
+    The same is checked for the files used in *filename* string literals, and
+    their names must also lead to the same files in the data path of the
+    lexer using the entry.
+
+    Setting maxsize to 0 disables the cache.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def key(lexer_class, full_path, binary=False):
+        """
+        Returns the cache key for a file read by a lexer of the given class.
+        Token positions are byte offsets when the file is read as binary.
+        """
+        return (lexer_class, binary) + _file_version(full_path)
+
+    def get(self, key, data_path):
+        """
+        Returns a TokenReplay for the cached file, or None. The data path is
+        the one used to find the files of *filename* string literals.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not _unchanged(entry[2]):
+                del self._entries[key]
+                entry = None
+            if entry is None or not _same_strings(entry[3], data_path):
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._entries.move_to_end(key)
+        tokens, lexdata, versions, _ = entry
+        return TokenReplay(tokens, lexdata, [version[0] for version in versions])
+
+    def store(self, key, lexer, files_read, strings_read):
+        """
+        Reads all tokens from the lexer and stores them. Returns a TokenReplay
+        for them.
+
+        The lexer's owner appends the files it reads to the files_read list,
+        and the name and real path of those used in string literals to
+        strings_read. Those read while lexing are stored with the tokens.
+        """
+        start = len(files_read)
+        strings_start = len(strings_read)
+        tokens = []
+        while token := lexer.token():
+            # Don't keep the lexer alive through the tokens
+            tokens.append(
+                Token(token.type, token.value, token.lineno, token.lexpos, None)
+            )
+        tokens = tuple(tokens)
+        # The text is kept for error messages. Streams only have the end of the
+        # file, and memory maps would keep file descriptors open.
+        lexdata = lexer.lexdata
+        if isinstance(lexer, StreamScanner) or not isinstance(lexdata, str):
+            lexdata = ""
+        files = files_read[start:]
+        versions = tuple(_file_version(path) for path in files)
+        strings = tuple(strings_read[strings_start:])
+
+        with self._lock:
+            self._entries[key] = (tokens, lexdata, versions, strings)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return TokenReplay(tokens, lexdata, files)
+
+    def clear(self):
+        """
+        Removes all entries and resets the statistics.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def cache_info(self):
+        """
+        Returns statistics about the cache, like functools.lru_cache.
+        """
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self.maxsize, len(self._entries))
+
+
+include_cache = IncludeCache()
+"""The cache used by all instances of SpecLexer."""
+
+
+def _disk_cache_path(cache_dir, parser_class, path, data_path, options):
+    """
+    Returns the name of the cache file for a call to load(), or None if the
+    options cannot be part of a key.
+    """
+    sections = options.get("sections")
+    if isinstance(sections, re.Pattern):
+        options = {**options, "sections": (sections.pattern, sections.flags)}
+    elif sections is not None and not isinstance(sections, str):
+        # Functions have no stable representation
+        return None
+
+    key = repr(
+        (
+            _DISK_CACHE_VERSION,
+            parser_class.__module__,
+            parser_class.__qualname__,
+            str(path),
+            [os.path.abspath(location) for location in data_path],
+            sorted(options.items()),
+        )
+    )
+    name = hashlib.sha256(key.encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, f"{name}.pickle")
+
+
+def _read_disk_cache(cache_path):
+    """
+    Returns the sections stored in a cache file, or None if the file is
+    missing or any of the files it was built from changed.
+    """
+    try:
+        with open(cache_path, "rb") as f:
+            manifest, sections = pickle.load(f)
+        if all(_file_digest(path) == digest for path, digest in manifest):
+            return sections
+        _log.debug("Stale cache entry %s", cache_path)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        _log.warning("Ignoring unreadable cache entry %s: %s", cache_path, e)
+    return None
+
+
+def _write_disk_cache(cache_path, files, sections):
+    """
+    Stores sections in a cache file, along with the digests of the files they
+    were read from. The file is replaced atomically.
+    """
+    manifest = [(path, _file_digest(path)) for path in dict.fromkeys(files)]
+    cache_dir = os.path.dirname(cache_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump((manifest, sections), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def load_cached(parser_class, path, data_path, cache_dir, options):
+    """
+    Implements load() for parser_class with a cache of the results in
+    cache_dir. See SpecParser.load().
+    """
+    cache_path = _disk_cache_path(cache_dir, parser_class, path, data_path, options)
+    if cache_path is not None:
+        sections = _read_disk_cache(cache_path)
+        if sections is not None:
+            return sections
+
+    parser = parser_class(path, data_path, **options)
+    sections = parser.get_all()
+
+    # Errors are only logged, and should be logged again next time
+    if cache_path is not None and not parser._errors:
+        try:
+            _write_disk_cache(cache_path, parser._files_read, sections)
+        except OSError as e:
+            _log.warning("Could not write cache entry %s: %s", cache_path, e)
+    return sections
@@ -0,0 +1,181 @@
+# This file is part of pyciv.
+#
+# pyciv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyciv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyciv.  If not, see <https://www.gnu.org/licenses/>.
+
+import weakref
+from collections.abc import Mapping
+from warnings import warn
+
+from .table import _Table
+
+# Layouts in use, so sections with the same keys share one
+_layouts = weakref.WeakValueDictionary()
+
+
+class _Layout:
+    """
+    Internal class describing the keys of CompactSection objects. Plain names
+    are stored as strings and qualified names as tuples. Nested names are
+    reachable from their prefix through the children dictionary.
+    """
+
+    __slots__ = ("keys", "index", "children", "__weakref__")
+
+    def __init__(self, keys):
+        self.keys = keys
+        self.index = {key: i for i, key in enumerate(keys)}
+        self.children = {(): {}}
+        for key in keys:
+            path = key if type(key) is tuple else (key,)
+            for depth in range(len(path)):
+                # Dictionaries keep the order in which names appear
+                self.children.setdefault(path[:depth], {})[path[depth]] = None
+        self.children = {
+            prefix: tuple(names) for prefix, names in self.children.items()
+        }
+
+    @classmethod
+    def of(cls, keys):
+        """
+        Returns the shared layout for a tuple of keys.
+        """
+        layout = _layouts.get(keys)
+        if layout is None:
+            layout = _layouts[keys] = cls(keys)
+        return layout
+
+
+class _NestedView(Mapping):
+    """
+    Internal class presenting the values stored under a qualified name prefix
+    as a mapping, in place of the nested Section used by default.
+    """
+
+    __slots__ = ("_section", "_prefix")
+
+    name = "[anonymous]"
+
+    def __init__(self, section, prefix):
+        self._section = section
+        self._prefix = prefix
+
+    def __getitem__(self, name):
+        return self._section._lookup(self._prefix + (name,), name)
+
+    def __iter__(self):
+        return iter(self._section._layout.children[self._prefix])
+
+    def __len__(self):
+        return len(self._section._layout.children[self._prefix])
+
+    def __repr__(self):
+        return f"Section('{self.name}', {dict(self)!r})"
+
+
+class CompactSection(Mapping):
+    """
+    A read-only alternative to Section, produced by parsers created with
+    compact=True.
+
+    The values are stored in a tuple and the keys in a layout shared by all
+    sections with the same keys in the same order, such as the sections of
+    all players in a saved game. Values stored using a qualified name (a.b.c)
+    are kept in the same tuple and presented as nested mappings on demand.
+    """
+
+    __slots__ = ("name", "_layout", "_values")
+
+    def __init__(self, name, keys, values):
+        """
+        Creates a section from the keys in a layout and the corresponding
+        values. See CompactSectionBuilder.
+        """
+        self.name = name
+        self._layout = _Layout.of(keys)
+        self._values = values
+
+    def __reduce__(self):
+        # The layout is shared again when unpickling
+        return CompactSection, (self.name, self._layout.keys, self._values)
+
+    def _lookup(self, path, name):
+        """
+        Returns the value or the nested mapping for a qualified name.
+        """
+        layout = self._layout
+        index = layout.index.get(path if len(path) > 1 else path[0])
+        if index is not None:
+            return self._values[index]
+        if path in layout.children:
+            return _NestedView(self, path)
+        raise KeyError(name)
+
+    def __getitem__(self, name):
+        index = self._layout.index.get(name)
+        if index is not None:
+            return self._values[index]
+        return self._lookup((name,), name)
+
+    def __iter__(self):
+        return iter(self._layout.children[()])
+
+    def __len__(self):
+        return len(self._layout.children[()])
+
+    def __repr__(self):
+        return f"CompactSection('{self.name}', {dict(self)!r})"
+
+
+class CompactSectionBuilder:
+    """
+    Collects the assignments of a section and builds a CompactSection. Names
+    are handled like Section does.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._keys = []
+        self._values = []
+        # Qualified names that hold a value (True) or nested names (False)
+        self._paths = {}
+
+    def __setitem__(self, name, value):
+        if isinstance(value, _Table):
+            value = value.to_list()
+        self._assign(name if type(name) is tuple else (name,), value)
+
+    def _assign(self, path, value):
+        paths = self._paths
+        for depth in range(1, len(path)):
+            prefix = path[:depth]
+            if paths.setdefault(prefix, False):
+                # The following is (unfortunately) allowed:
+                # a = 1
+                # a.b = 2
+                # We emit a warning and append $ to the second name
+                warn('Cannot represent the value of "%s"' % prefix[-1])
+                self._assign(prefix[:-1] + (prefix[-1] + "$",) + path[depth:], value)
+                return
+
+        if path in paths:
+            raise ValueError('duplicate name "%s"' % path[-1])
+        paths[path] = True
+        self._keys.append(path if len(path) > 1 else path[0])
+        self._values.append(value)
+
+    def build(self):
+        """
+        Returns the CompactSection.
+        """
+        return CompactSection(self.name, tuple(self._keys), tuple(self._values))
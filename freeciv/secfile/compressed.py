@@ -0,0 +1,125 @@
+# This file is part of pyciv.
+#
+# pyciv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyciv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyciv.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Support for the compressed files written by Freeciv, mostly saved games.
+"""
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+
+# Zstandard is in the standard library since Python 3.14, and otherwise
+# optional.
+try:
+    from compression import zstd
+except ImportError:
+    zstd = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+_MAGIC = (
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "xz"),
+    (b"\x28\xb5\x2f\xfd", "zstd"),
+)
+
+_EXTENSIONS = {
+    ".gz": "gzip",
+    ".bz2": "bz2",
+    ".xz": "xz",
+    ".zst": "zstd",
+}
+
+
+def sniff_compression(file, path):
+    """
+    Returns the compression used for a file opened in binary mode from its
+    first bytes, which are left to be read, or None for plain files. Empty
+    files are recognized from the extension of their path.
+    """
+    head = file.peek(6)[:6]
+    for magic, name in _MAGIC:
+        if head.startswith(magic):
+            return name
+    if head:
+        # Not empty and no known magic, so not compressed
+        return None
+    return compression_from_extension(path)
+
+
+def detect_compression(path):
+    """
+    Returns the compression used for the file at path ("gzip", "bz2", "xz" or
+    "zstd"), or None for plain files. The magic bytes at the start of the file
+    are checked first, then the extension.
+    """
+    with open(path, "rb") as f:
+        return sniff_compression(f, path)
+
+
+def open_text(path):
+    """
+    Opens a file for reading as UTF-8 text, decompressing it on the fly if
+    needed. Plain files are only opened once: the compression is recognized
+    from the first bytes read through the returned file.
+    """
+    f = open(path, "rb")
+    try:
+        compression = sniff_compression(f, path)
+    except BaseException:
+        f.close()
+        raise
+    if compression is None:
+        return io.TextIOWrapper(f, encoding="utf-8")
+    f.close()
+    return open_compressed(path, compression)
+
+
+def compression_from_extension(path):
+    """
+    Returns the compression to use for a new file at path based on its
+    extension, or None for plain files.
+    """
+    return _EXTENSIONS.get(os.path.splitext(path)[1].lower())
+
+
+def open_compressed(path, compression, mode="rt"):
+    """
+    Opens a compressed file as UTF-8 text, for reading by default. The data is
+    decompressed as it is read, or compressed as it is written with mode="wt".
+    """
+    if compression == "gzip":
+        return gzip.open(path, mode, encoding="utf-8")
+    elif compression == "bz2":
+        return bz2.open(path, mode, encoding="utf-8")
+    elif compression == "xz":
+        return lzma.open(path, mode, encoding="utf-8")
+    elif compression == "zstd":
+        if zstd is not None:
+            return zstd.open(path, mode, encoding="utf-8")
+        elif zstandard is not None:
+            return zstandard.open(path, mode, encoding="utf-8")
+        raise ValueError(
+            f'Cannot open "{path}": Zstandard support requires Python 3.14 or '
+            "the zstandard module"
+        )
+    raise ValueError(f'Unknown compression "{compression}"')
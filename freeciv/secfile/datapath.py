@@ -0,0 +1,138 @@
+# This file is part of pyciv.
+#
+# pyciv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyciv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyciv.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+
+
+class DataPath:
+    """
+    A list of data directories in which files are looked up, like the
+    FREECIV_DATA_PATH.
+
+    Each directory is listed once, the first time a file is looked up in it,
+    and the listing is reused by all later lookups. A single DataPath can be
+    shared by all the files of a ruleset or tileset. Files created or removed
+    after a directory was listed are only seen after calling invalidate() or
+    refresh(). Names that only differ in case from a listed file are checked
+    on disk, so they are found on case-insensitive file systems.
+
+    Iterating over a DataPath gives the locations, so it can be used wherever
+    a list of directories is expected.
+    """
+
+    def __init__(self, locations):
+        """
+        Creates a resolver for the given list of directories.
+        """
+        self.locations = tuple(os.fspath(location) for location in locations)
+        self._listings = {}
+        # Case-folded listings, built when a name is missing from a listing
+        self._folded = {}
+
+    @classmethod
+    def of(cls, path):
+        """
+        Returns path if it is already a DataPath, or a new DataPath for the
+        list of directories otherwise.
+        """
+        return path if isinstance(path, cls) else cls(path)
+
+    def __iter__(self):
+        return iter(self.locations)
+
+    def __len__(self):
+        return len(self.locations)
+
+    def __repr__(self):
+        return f"DataPath({list(self.locations)!r})"
+
+    def _listing(self, directory):
+        """
+        Returns the set of the names of the files in a directory.
+        """
+        listing = self._listings.get(directory)
+        if listing is None:
+            try:
+                with os.scandir(directory) as entries:
+                    listing = frozenset(
+                        entry.name for entry in entries if entry.is_file()
+                    )
+            except OSError:
+                # Missing or not a directory
+                listing = frozenset()
+            self._listings[directory] = listing
+        return listing
+
+    def _folded_listing(self, directory):
+        """
+        Returns the set of the case-folded names of the files in a directory.
+        """
+        folded = self._folded.get(directory)
+        if folded is None:
+            folded = frozenset(name.casefold() for name in self._listing(directory))
+            self._folded[directory] = folded
+        return folded
+
+    def find_all(self, name):
+        """
+        Generates the paths of all the files called name in the data
+        directories, in order. Absolute names are used as is.
+        """
+        if os.path.isabs(name):
+            if os.path.isfile(name):
+                yield name
+            return
+
+        for location in self.locations:
+            full_path = os.path.join(location, name)
+            directory, base = os.path.split(full_path)
+            if base in self._listing(directory):
+                yield full_path
+            elif base.casefold() in self._folded_listing(directory):
+                # Case-insensitive file systems find the file in another case
+                if os.path.isfile(full_path):
+                    yield full_path
+
+    def find(self, name):
+        """
+        Returns the path of the first file called name in the data
+        directories, or None if there is none.
+        """
+        return next(self.find_all(name), None)
+
+    def invalidate(self, directory=None):
+        """
+        Forgets the contents of a directory, or of all directories if none is
+        given. They are listed again the next time they are needed.
+        """
+        if directory is None:
+            self._listings.clear()
+            self._folded.clear()
+        else:
+            directory = os.path.normpath(directory)
+            for key in list(self._listings):
+                if os.path.normpath(key) == directory:
+                    del self._listings[key]
+                    self._folded.pop(key, None)
+
+    def refresh(self):
+        """
+        Lists again all the directories looked at so far.
+        """
+        directories = list(self._listings)
+        self._listings.clear()
+        self._folded.clear()
+        for directory in directories:
+            self._listing(directory)
@@ -0,0 +1,208 @@
+# This file is part of pyciv.
+#
+# pyciv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyciv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyciv.  If not, see <https://www.gnu.org/licenses/>.
+
+from .bulk import load_many
+from .cache import load_cached
+from .compact import CompactSectionBuilder
+from .index import load_section
+from .lexer import SpecLexer
+from .parser import Section, _scalar_value
+from .scanner import Token
+from .table import _Table
+
+# Stands for the end of the token stream, so the lookahead is never None
+_END = Token("$end", None, 0, 0, None)
+
+_SCALARS = ("STRING_LITERAL", "NUMBER", "BOOLEAN")
+
+
+class DescentParser(SpecLexer):
+    """
+    A hand-written recursive-descent parser for Freeciv INI-like file format.
+
+    This is a drop-in alternative to SpecParser: it accepts the same grammar,
+    produces the same Section objects and has the same get_all() and load()
+    API. It builds the sections directly instead of going through the LALR
+    machinery and one callback per production, which makes it faster. Any
+    scanner supported by SpecLexer can be used.
+
+    Unlike SpecParser, which logs syntax errors and gives up, this parser
+    raises a ValueError after logging the error.
+    """
+
+    def __init__(self, *args, columnar=False, compact=False, **kwargs):
+        """
+        Constructor. Arguments are passed to SpecLexer. See SpecParser for
+        columnar and compact.
+        """
+        super().__init__(*args, **kwargs)
+        self._columnar = columnar
+        self._compact = compact
+
+    def _next(self):
+        """
+        Moves to the next token and returns the previous one.
+        """
+        token = self._lookahead
+        self._lookahead = self.token() or _END
+        return token
+
+    def _unexpected(self):
+        """
+        Reports an error about the current token.
+        """
+        token = self._lookahead
+        if token is _END:
+            self._error(None, "unexpected end of file")
+            raise ValueError("unexpected end of file")
+        self._error(token, f"unexpected token: {token.type}")
+        raise ValueError(f"unexpected token: {token.type}")
+
+    def _expect(self, type):
+        """
+        Consumes a token of the given type and returns it.
+        """
+        if self._lookahead.type != type:
+            self._unexpected()
+        return self._next()
+
+    def _newlines(self, required=False):
+        """
+        Skips new lines, which are collapsed. Raises an error if none is found
+        and they were required.
+        """
+        if required and self._lookahead.type != "\n":
+            self._unexpected()
+        while self._lookahead.type == "\n":
+            self._next()
+
+    def _scalar(self):
+        """
+        scalar : STRING_LITERAL | NUMBER | BOOLEAN
+        """
+        if self._lookahead.type not in _SCALARS:
+            self._unexpected()
+        return _scalar_value(self._next().value)
+
+    def _table(self):
+        """
+        table : '{' [nl] STRING_LITERAL (',' STRING_LITERAL)* ([nl] value)* [nl] '}'
+        """
+        self._expect("{")
+        self._newlines()
+
+        columns = [self._expect("STRING_LITERAL").value]
+        while self._lookahead.type == ",":
+            self._next()
+            columns.append(self._expect("STRING_LITERAL").value)
+
+        table = _Table(columns)
+        self._newlines()
+        while self._lookahead.type != "}":
+            table.rows.append(self._value())
+            self._newlines()
+        self._next()
+        return table.to_columns() if self._columnar else table
+
+    def _value(self):
+        """
+        value : scalar | scalar (',' [nl] scalar)+ | table
+        """
+        if self._lookahead.type == "{":
+            return self._table()
+
+        value = self._scalar()
+        if self._lookahead.type != ",":
+            return value
+
+        values = [value]
+        while self._lookahead.type == ",":
+            self._next()
+            self._newlines()
+            values.append(self._scalar())
+        return values
+
+    def _assignment(self, section):
+        """
+        assignment : IDENTIFIER ('.' IDENTIFIER)* '=' [nl] value nl
+        """
+        name = self._expect("IDENTIFIER").value
+        if self._lookahead.type == ".":
+            name = (name,)
+            while self._lookahead.type == ".":
+                self._next()
+                name += (self._expect("IDENTIFIER").value,)
+
+        self._expect("=")
+        self._newlines()
+        section[name] = self._value()
+        self._newlines(required=True)
+
+    def _section(self):
+        """
+        section : SECTION_HEADER nl assignment*
+        """
+        section_class = CompactSectionBuilder if self._compact else Section
+        section = section_class(self._expect("SECTION_HEADER").value)
+        self._newlines(required=True)
+        while self._lookahead.type == "IDENTIFIER":
+            self._assignment(section)
+        return section.build() if self._compact else section
+
+    def __iter__(self):
+        """
+        Yields the sections in the file as they are parsed.
+        """
+        try:
+            self._lookahead = None
+            self._next()
+            self._newlines()
+            while self._lookahead is not _END:
+                yield self._section()
+                self._newlines()
+        finally:
+            # Don't keep memory maps open when the caller stops early
+            self.close()
+
+    def get_all(self):
+        """
+        Returns a list of all sections.
+        """
+        return [section for section in self]
+
+    @classmethod
+    def load(cls, path, freeciv_path, *, cache_dir=None, **kwargs):
+        """
+        Loads all sections from a file. Keyword arguments are passed to the
+        constructor. See SpecParser.load() for cache_dir.
+        """
+        if cache_dir is not None:
+            return load_cached(cls, path, freeciv_path, cache_dir, kwargs)
+        return cls(path, freeciv_path, **kwargs).get_all()
+
+    @classmethod
+    def load_many(cls, paths, freeciv_path, *, workers=None, **kwargs):
+        """
+        Loads several files in parallel. See SpecParser.load_many().
+        """
+        return load_many(cls, paths, freeciv_path, workers, kwargs)
+
+    @classmethod
+    def load_section(cls, path, freeciv_path, name, **kwargs):
+        """
+        Loads the first section called name from a file. See
+        SpecParser.load_section().
+        """
+        return load_section(cls, path, freeciv_path, name, kwargs)
@@ -0,0 +1,182 @@
+# This file is part of pyciv.
+#
+# pyciv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyciv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyciv.  If not, see <https://www.gnu.org/licenses/>.
+
+import json
+import logging
+import os
+from collections import namedtuple
+
+from .cache import _file_version, _unchanged
+from .compressed import detect_compression
+from .datapath import DataPath
+from .lexer import SpecLexer
+
+_log = logging.getLogger(__name__)
+
+# Bump when the format of index files changes
+_INDEX_VERSION = 1
+
+IndexEntry = namedtuple("IndexEntry", "name file offset lineno")
+IndexEntry.__doc__ = """
+The location of a section header. The offset is in bytes from the start of
+the file, or None if the file is compressed.
+"""
+
+
+def _locate(name, data_path):
+    """
+    Returns the real path of the file the lexer would read for name.
+    """
+    full_path = DataPath.of(data_path).find(name)
+    if full_path is None:
+        raise FileNotFoundError(f"No such file or directory: '{name}'")
+    return os.path.realpath(full_path)
+
+
+class SectionIndex:
+    """
+    The locations of all section headers in a file and the files it includes,
+    in order. Indices are saved next to the file they describe, with an .idx
+    extension, and rebuilt when any of the files changes.
+
+    Like selective parsing, indexing only tokenizes section headers and
+    *include statements; see SpecLexer._skip_section().
+    """
+
+    def __init__(self, entries, files):
+        """
+        Creates an index from a list of IndexEntry and the versions of the
+        files they were found in, as returned by cache._file_version().
+        """
+        self.entries = entries
+        self.files = files
+
+    @classmethod
+    def build(cls, path, data_path):
+        """
+        Indexes the file that a SpecLexer would read for path.
+        """
+        lexer = SpecLexer(path, data_path, scanner="regex", memory_map=True)
+        compressed = {}
+        entries = []
+        while token := lexer.token():
+            if token.type != "SECTION_HEADER":
+                continue
+            file = lexer._current_file()
+            if file not in compressed:
+                compressed[file] = detect_compression(file) is not None
+            offset = None if compressed[file] else token.lexpos
+            entries.append(IndexEntry(token.value, file, offset, token.lineno))
+            lexer._skip_section()
+
+        files = [_file_version(file) for file in dict.fromkeys(lexer._files_read)]
+        return cls(entries, files)
+
+    @classmethod
+    def load(cls, path, data_path):
+        """
+        Returns the index for path, reading it from its .idx file if it is up
+        to date, and building and saving it otherwise.
+        """
+        data_path = DataPath.of(data_path)
+        index_path = _locate(path, data_path) + ".idx"
+        try:
+            with open(index_path, encoding="utf-8") as f:
+                index = cls._from_json(json.load(f))
+            if index is not None and index.is_fresh():
+                return index
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            _log.warning("Ignoring unreadable index %s: %s", index_path, e)
+
+        index = cls.build(path, data_path)
+        try:
+            index.save(index_path)
+        except OSError as e:
+            _log.info("Could not write index %s: %s", index_path, e)
+        return index
+
+    @classmethod
+    def _from_json(cls, data):
+        """
+        Creates an index from the contents of an index file, or returns None
+        if it uses another version of the format.
+        """
+        if data.get("version") != _INDEX_VERSION:
+            return None
+        files = [tuple(version) for version in data["files"]]
+        entries = [
+            IndexEntry(name, files[file][0], offset, lineno)
+            for name, file, offset, lineno in data["sections"]
+        ]
+        return cls(entries, files)
+
+    def save(self, index_path):
+        """
+        Writes the index to a file.
+        """
+        numbers = {version[0]: i for i, version in enumerate(self.files)}
+        data = {
+            "version": _INDEX_VERSION,
+            "files": self.files,
+            "sections": [
+                (entry.name, numbers[entry.file], entry.offset, entry.lineno)
+                for entry in self.entries
+            ],
+        }
+        with open(index_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+    def is_fresh(self):
+        """
+        Checks that none of the indexed files changed.
+        """
+        return _unchanged(self.files)
+
+    def find(self, name):
+        """
+        Returns the entry for the first section with the given name, or None.
+        """
+        for entry in self.entries:
+            if entry.name == name:
+                return entry
+        return None
+
+
+def load_section(parser_class, path, data_path, name, options):
+    """
+    Implements load_section() for parser_class. See SpecParser.load_section().
+    """
+    data_path = DataPath.of(data_path)
+    entry = SectionIndex.load(path, data_path).find(name)
+    if entry is None:
+        raise KeyError(name)
+
+    if entry.offset is None:
+        # Compressed files cannot be seeked in, stream through them instead
+        parser = parser_class(
+            entry.file, data_path, sections=lambda other: other == name, **options
+        )
+    else:
+        # The file is only read from the offset until the end of the section.
+        # Its name is absolute and found in any location.
+        parser = parser_class._for_section(
+            entry.file, data_path, entry.offset, entry.lineno, **options
+        )
+
+    for section in parser:
+        return section
+    raise KeyError(name)
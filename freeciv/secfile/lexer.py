@@ -13,14 +13,55 @@
 # You should have received a copy of the GNU General Public License
 # along with pyciv.  If not, see <https://www.gnu.org/licenses/>.
 
+import io
 import logging
+import mmap
 import os
 import re
+import sys
+import threading
 
 from ply.lex import lex
 
+from .cache import TokenReplay, include_cache
+from .compressed import open_compressed, open_text, sniff_compression
+from .datapath import DataPath
+from .scanner import RegexScanner, StreamScanner, next_section_regex
+
 _log = logging.getLogger(__name__)
 
+# Serializes the construction of lexer templates
+_template_lock = threading.Lock()
+
+
+def _bind_lexer(template, owner):
+    """
+    Returns a copy of the PLY lexer template with all rules bound to owner.
+
+    This is what template.clone(owner) is meant to do, but PLY 3.11 only keeps
+    the last master regex when rebinding and leaves the current state bound to
+    the template's object.
+    """
+
+    def rebind(entry):
+        if not entry or not entry[0]:
+            return entry
+        func, name = entry
+        return getattr(owner, func.__name__), name
+
+    lexer = template.clone()
+    lexer.lexstatere = {
+        state: [(regex, [rebind(entry) for entry in index]) for regex, index in rules]
+        for state, rules in template.lexstatere.items()
+    }
+    lexer.lexstateerrorf = {
+        state: getattr(owner, func.__name__)
+        for state, func in template.lexstateerrorf.items()
+    }
+    lexer.lexmodule = owner
+    lexer.begin("INITIAL")
+    return lexer
+
 
 class SpecLexer:
     """
@@ -56,6 +97,10 @@ class SpecLexer:
     # \n matched by WHITESPACE below, include it so we can produce '\n' tokens
     literals = ",.=}{\n"
 
+    # The byte offset and line to start reading the first file at, set by
+    # _for_section()
+    _window = None
+
     def t_GETTEXT_LITERAL(self, t):
         r"""
         _\("                    # Opening
@@ -100,20 +145,7 @@ class SpecLexer:
 
     def t_STRING_FROM_FILE(self, t):
         r"\*[^\r\n]+\*"
-        # Try to locate the file.
-        name = t.value[1:-1]
-        found = False
-        for location in self.data_path:
-            full_path = os.path.join(location, name)
-            if os.path.isfile(full_path):
-                # Found!
-                with open(full_path, encoding="utf-8") as f:
-                    t.value = f.read()
-                    found = True
-        if not found:
-            self._error(t, f'Could not find a file called "{name}"')
-            raise ValueError(f'Could not find a file called "{name}"')
-
+        t.value = self._read_file_string(t, t.value[1:-1])
         t.type = "STRING_LITERAL"
         return t
 
@@ -122,7 +154,7 @@ class SpecLexer:
 
     def t_SECTION_HEADER(self, t):
         r"\[.*\]"
-        t.value = t.value[1:-1]
+        t.value = sys.intern(t.value[1:-1])
         return t
 
     def t_NUMBER(self, t):
@@ -147,41 +179,149 @@ class SpecLexer:
         if t.value.lower() in ("true", "false"):
             t.type = "BOOLEAN"
             t.value = t.value.lower() == "true"
+        else:
+            t.value = sys.intern(t.value)
         return t
 
     def t_error(self, t):
         """
         Called by PLY when it cannot match any token.
         """
-        escaped = t.lexer.lexdata[t.lexer.lexpos].encode("ascii", "backslashreplace")
-        self._error(t, 'illegal character "%s":' % escaped.decode("ascii"))
+        char = t.lexer.lexdata[t.lexer.lexpos : t.lexer.lexpos + 1]
+        if isinstance(char, str):
+            char = char.encode("ascii", "backslashreplace")
+        self._error(
+            t, 'illegal character "%s":' % char.decode("ascii", "backslashreplace")
+        )
 
     def _error(self, t, message):
         """
         Prints an error message pointing to the given token t.
         """
-        if t:
+        self._errors += 1
+        lexer = getattr(t, "lexer", None)
+        if t and not hasattr(lexer, "lexdata") and self._lexer_stack:
+            # PLY doesn't set the lexer of literal tokens
+            lexer = self._current_lexer()
+        if t and hasattr(lexer, "lexdata"):
             for path in self._file_stack:
                 _log.error("In %s:" % path)
-            line_start = t.lexer.lexdata.rfind("\n", 0, t.lexpos) + 1
-            line_end = t.lexer.lexdata.find("\n", t.lexpos)
+            data = lexer.lexdata
+            newline = "\n" if isinstance(data, str) else b"\n"
+            line_start = data.rfind(newline, 0, t.lexpos) + 1
+            line_end = data.find(newline, t.lexpos)
+            line, column = data[line_start:line_end], data[line_start : t.lexpos]
+            if not isinstance(data, str):
+                # Memory-mapped files are bytes
+                line = line.decode("utf-8", "replace")
+                column = column.decode("utf-8", "replace")
             _log.error("Line %d: %s" % (t.lineno, message))
-            _log.error(t.lexer.lexdata[line_start:line_end])
-            _log.error(" " * (t.lexpos - line_start) + "^")
+            _log.error(line)
+            _log.error(" " * len(column) + "^")
         else:
             _log.error("In global context:")
             _log.error(message)
 
-    def __init__(self, file_name, data_path):
+    def _read_file_string(self, t, name):
+        """
+        Returns the contents of the file used in a *filename* string literal.
+        The token t is used in error messages.
+        """
+        full_path = self.data_path.find(name)
+        if full_path is None:
+            self._error(t, f'Could not find a file called "{name}"')
+            raise ValueError(f'Could not find a file called "{name}"')
+        full_path = os.path.realpath(full_path)
+        self._files_read.append(full_path)
+        self._strings_read.append((name, full_path))
+        with open_text(full_path) as f:
+            value = f.read()
+        return value
+
+    def __init__(
+        self, file_name, data_path, *, scanner="ply", sections=None, memory_map=False
+    ):
         """
         Initializes a parser to read data from the given file. The file is
-        located by appending its name to all entries of data_path.
+        located by appending its name to all entries of data_path, which can
+        be a list of directories or a DataPath.
+
+        The scanner selects how each file is split into tokens: "ply" uses the
+        rules of this class through PLY, "regex" uses the faster RegexScanner
+        built from the same rules.
+
+        When sections is given, only the sections whose name it matches are
+        read and the others are skipped without being tokenized. It can be a
+        regular expression (matched like the regex of @section) or a function
+        taking the section name and returning a bool.
+
+        With memory_map, files are mapped in memory and scanned as bytes
+        instead of being read and decoded in full. Only the values of the
+        tokens are decoded, and the OS takes care of buffering. This requires
+        the regex scanner, and identifiers are then limited to ASCII.
+
+        Compressed files cannot be mapped. Whatever the scanner, they are
+        streamed through a StreamScanner, which follows the same rules as the
+        regex scanner, and decompressed as they are read instead of in full.
         """
-        self.data_path = data_path
+        if scanner not in ("ply", "regex"):
+            raise ValueError(f'Unknown scanner "{scanner}"')
+        if memory_map and scanner != "regex":
+            raise ValueError("memory_map requires the regex scanner")
+
+        if isinstance(sections, str):
+            sections = re.compile(sections)
+        if isinstance(sections, re.Pattern):
+            sections = sections.match
+
+        self.data_path = DataPath.of(data_path)
+        self._scanner = scanner
+        self._section_filter = sections
+        self._memory_map = memory_map
         self._lexer_stack = list()
         self._file_stack = list()
+        self._files_read = list()
+        # Files used in string literals, as (name, real path)
+        self._strings_read = list()
+        self._errors = 0
+        # Whether the current section is rejected by the section filter
+        self._skipping = False
         self._push_file(file_name, None, throw=True)
 
+    @classmethod
+    def _for_section(cls, file_name, data_path, offset, lineno, **kwargs):
+        """
+        Creates an instance that starts reading the file at a byte offset,
+        which is on line lineno, and streams it from there. Other arguments
+        are passed to the constructor. See load_section().
+        """
+        lexer = cls.__new__(cls)
+        lexer._window = (offset, lineno)
+        lexer.__init__(file_name, data_path, **kwargs)
+        return lexer
+
+    @classmethod
+    def _lexer_template(cls):
+        """
+        Returns the PLY lexer shared by all instances of the class. Building a
+        lexer compiles and validates the master regex, which is expensive, so
+        it is done once and the result is cloned for every file. The template
+        itself is never used to scan anything, so it can be shared by threads.
+        """
+        template = cls.__dict__.get("_template")
+        if template is None:
+            with _template_lock:
+                template = cls.__dict__.get("_template")
+                if template is None:
+                    # The rules are collected from a bare instance so the
+                    # template doesn't keep any parsing state alive.
+                    template = lex(
+                        module=cls.__new__(cls),
+                        reflags=re.UNICODE | re.VERBOSE | re.MULTILINE,
+                    )
+                    cls._template = template
+        return template
+
     def _current_lexer(self):
         """
         Returns the path of the lexer for the file currently being processed.
@@ -194,6 +334,59 @@ class SpecLexer:
         """
         return self._file_stack[-1]
 
+    def _open_lexer(self, full_path):
+        """
+        Returns a lexer for the file at full_path. Compressed files are
+        detected from their first bytes and streamed through a StreamScanner,
+        whatever the scanner, so they are never decompressed in memory first.
+        """
+        if self._window is not None:
+            return self._open_window(full_path)
+
+        with open(full_path, "rb") as f:
+            compression = sniff_compression(f, full_path)
+            if compression is None and self._memory_map:
+                try:
+                    data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except ValueError:
+                    # Empty files cannot be mapped
+                    data = b""
+                return RegexScanner(self, data)
+            elif compression is None:
+                with io.TextIOWrapper(f, encoding="utf-8") as text:
+                    data = text.read()
+
+        if compression is not None:
+            return StreamScanner(self, open_compressed(full_path, compression))
+        return self._text_lexer(data)
+
+    def _open_window(self, full_path):
+        """
+        Returns a lexer starting at the position of the file at full_path
+        given by _window, which is then cleared. The file is streamed so only
+        the part that is parsed is read.
+        """
+        offset, lineno = self._window
+        self._window = None
+        f = open(full_path, "rb")
+        f.seek(offset)
+        lexer = StreamScanner(self, io.TextIOWrapper(f, encoding="utf-8"))
+        lexer.lineno = lineno
+        return lexer
+
+    def _text_lexer(self, data):
+        """
+        Returns a lexer for a string with the selected scanner.
+        """
+        if self._scanner == "regex":
+            return RegexScanner(self, data)
+
+        lexer = _bind_lexer(self._lexer_template(), self)
+        lexer.lexpos = 0
+        lexer.lineno = 1
+        lexer.input(data)
+        return lexer
+
     def _push_file(self, name, token, throw=False):
         """
         Pushes a file on the internal stack. The file is looked up in data_path
@@ -214,38 +407,74 @@ class SpecLexer:
             return
 
         # Try to locate the file.
-        for location in self.data_path:
-            full_path = os.path.join(location, name)
-            if os.path.isfile(full_path):
-                # Found!
-                full_path = os.path.realpath(full_path)
-
-                if full_path in self._file_stack:
-                    # But we're already parsing the same file...
-                    _raise_error(self, token, "infinite recursion")
-                    return
-
-                try:
-                    # Push the file to the stacks
-                    with open(full_path, encoding="utf-8") as f:
-                        lexer = lex(
-                            module=self, reflags=re.UNICODE | re.VERBOSE | re.MULTILINE
-                        )
-                        lexer.lexpos = 0
-                        lexer.lineno = 1
-
-                        lexer.input(f.read())
-
-                        self._file_stack.append(full_path)
-                        self._lexer_stack.append(lexer)
-                        return
-                except Exception as e:
-                    _raise_error(self, token, f'could not open "{full_path}": {e}', e)
+        for full_path in self.data_path.find_all(name):
+            full_path = os.path.realpath(full_path)
+
+            if full_path in self._file_stack:
+                # But we're already parsing the same file...
+                _raise_error(self, token, "infinite recursion")
+                return
+
+            # Included files are often shared between rulesets
+            use_cache = token is not None and include_cache.maxsize > 0
+
+            try:
+                key = (
+                    include_cache.key(type(self), full_path, self._memory_map)
+                    if use_cache
+                    else None
+                )
+                lexer = key and include_cache.get(key, self.data_path)
+                if not lexer:
+                    lexer = self._open_lexer(full_path)
+            except Exception as e:
+                _raise_error(self, token, f'could not open "{full_path}": {e}', e)
+                continue
+
+            # Push the file to the stacks
+            self._file_stack.append(full_path)
+            self._lexer_stack.append(lexer)
+            self._files_read.append(full_path)
+            if isinstance(lexer, TokenReplay):
+                self._files_read.extend(lexer.files)
+            elif key:
+                # Errors in the file are reported with the file pushed
+                lexer = include_cache.store(
+                    key, lexer, self._files_read, self._strings_read
+                )
+                self._lexer_stack[-1] = lexer
+            return
 
         _raise_error(
             self, token, f"No such file or directory: '{name}'", type=FileNotFoundError
         )
 
+    def _skip_section(self):
+        """
+        Moves the current lexer to the next line starting with a section
+        header or an *include, without tokenizing anything in between.
+
+        This is a textual search: a line of a multi-line string starting with
+        "[" would be mistaken for a section header.
+        """
+        lexer = self._current_lexer()
+        if isinstance(lexer, (RegexScanner, TokenReplay)):
+            lexer.skip_section()
+        else:
+            match = next_section_regex.search(lexer.lexdata, lexer.lexpos)
+            end = match.start() if match else len(lexer.lexdata)
+            lexer.lineno += lexer.lexdata.count("\n", lexer.lexpos, end)
+            lexer.lexpos = end
+
+    def close(self):
+        """
+        Closes the files that are still open, such as memory maps, when the
+        caller stops before the end. No tokens can be read afterwards.
+        """
+        for lexer in self._lexer_stack:
+            if isinstance(lexer, RegexScanner):
+                lexer.close()
+
     def _pop_file(self):
         """
         Pops a file off the internal stack.
@@ -277,7 +506,20 @@ class SpecLexer:
         """
         Retrieves the next token in the stream, or None. Handles file includes.
         """
-        token = self._next_token_unwinding_stack()
+        # Most of the time, the current file has tokens left
+        token = self._lexer_stack[-1].token()
+        if token is None:
+            token = self._next_token_unwinding_stack()
+
+        # Skip the sections the caller is not interested in, including the
+        # contents of files they include, until the next accepted header
+        while token is not None and self._section_filter:
+            if token.type == "SECTION_HEADER":
+                self._skipping = not self._section_filter(token.value)
+            if not self._skipping or token.type == "INCLUDE":
+                break
+            self._skip_section()
+            token = self._next_token_unwinding_stack()
 
         # Process *include directives. This is also handled at the token level
         # by the native code.
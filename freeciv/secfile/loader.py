@@ -13,12 +13,20 @@
 # You should have received a copy of the GNU General Public License
 # along with pyciv.  If not, see <https://www.gnu.org/licenses/>.
 
+import dataclasses
 import logging
+import os
 import re
+from collections.abc import Mapping, MutableMapping
+from contextlib import contextmanager
+from contextvars import ContextVar
 from typing import NewType, TypeVar, Union, get_args, get_origin, get_type_hints
 
+import typeguard
 from typeguard import check_type
 
+from .table import ColumnTable
+
 try:
     from typeguard import TypeCheckError
 
@@ -28,6 +36,79 @@ except ImportError:
     typeguard_version = 2
 
 
+# Whether the loader skips the checks of the classes decorated with
+# typechecked()
+_trusted = os.environ.get("PYCIV_TRUSTED", "") not in ("", "0")
+
+# The undecorated __init__ of the classes decorated with typechecked()
+_plain_inits = {}
+
+# Whether the loader checks the types of the values it converts
+_validating = ContextVar("validating", default=False)
+
+
+def typechecked(cls):
+    """
+    Replacement for the typechecked() decorator of typeguard, for classes.
+
+    The class is instrumented by typeguard, but its original __init__ is kept.
+    In trusted mode, the loader calls it directly to build objects, so no
+    typeguard wrapper runs. See set_trusted().
+    """
+    init = cls.__dict__.get("__init__")
+    cls = typeguard.typechecked(cls)
+    if init is not None and cls.__dict__.get("__init__") is not init:
+        _plain_inits[cls] = init
+    return cls
+
+
+def set_trusted(trusted):
+    """
+    Enables or disables the trusted mode. In trusted mode, the loader builds
+    objects of the classes decorated with typechecked() without the checks of
+    typeguard, which makes loading faster. This is meant for data that is
+    known to be valid; use validate() to check it separately. The classes
+    are not changed, and still check calls made outside of the loader.
+
+    Typeguard 2 checks every call at run time, and trusted mode makes loading
+    many times faster. Typeguard 4 leaves the __init__ generated by
+    dataclasses alone, so trusted mode makes no difference for dataclasses.
+
+    The trusted mode is enabled at startup when the PYCIV_TRUSTED environment
+    variable is set to a value other than 0.
+    """
+    global _trusted
+    _trusted = bool(trusted)
+
+
+def is_trusted():
+    """
+    Returns whether the trusted mode is enabled. See set_trusted().
+    """
+    return _trusted
+
+
+@contextmanager
+def validating():
+    """
+    Makes the loader check that the values in the data have the types of the
+    fields they are converted to, in trusted mode or not. The loader otherwise
+    converts values as needed, for instance numbers to strings. The checks are
+    done in the current thread (or asyncio task) until the end of the with
+    block:
+
+        with validating():
+            ruleset = Ruleset(name, path)
+
+    A TypeCheckError is raised for the first value of the wrong type.
+    """
+    token = _validating.set(True)
+    try:
+        yield
+    finally:
+        _validating.reset(token)
+
+
 def NamedReference(T):
     ref_type = NewType("NamedReference", Union[str, T])
     ref_type.wrapped = T.__name__ if type(T) == type else T
@@ -68,110 +149,500 @@ def section(section_regex):
     return annotate
 
 
-def _list_from_value(value, target_content_type=None):
+def _list_from_value(value, convert_item):
     """
-    Coerces a value to a list. This is only valid in the context of data parsed
-    using a SpecParser.
+    Coerces a value to a list, converting the items with convert_item. This is
+    only valid in the context of data parsed using a SpecParser.
     """
-    if type(value) == list:
+    if type(value) == list or isinstance(value, ColumnTable):
         # Then coerce the contents!
-        return [_instance_from_value(item, target_content_type) for item in value]
+        return [convert_item(item) for item in value]
     elif value == "":
         # This is sometimes used as an empty list
         return []
     else:
         # The spec format cannot distinguish between a one-element list and a
         # value
-        return [_instance_from_value(value, target_content_type)]
+        return [convert_item(value)]
 
 
-def _instance_from_value(value, target_class, name=""):
+def _checked(target_type):
+    """
+    Returns a function checking that values have a type that cannot be
+    converted to, such as a union, and returning them unchanged.
+    """
+    if typeguard_version == 3:
+
+        def check(value, name=""):
+            check_type(value, target_type)
+            return value
+
+    else:
+
+        def check(value, name=""):
+            check_type(name, value, target_type)
+            return value
+
+    return check
+
+
+def _matches(value, target_type):
+    """
+    Checks whether a value read from a file can be converted to target_type
+    without losing information. Unions and other special forms are checked
+    when converting.
+    """
+    if target_type in (bool, int, str):
+        return type(value) is target_type
+    elif target_type is float:
+        return type(value) in (int, float)
+    elif hasattr(target_type, "wrapped"):
+        # NamedReference
+        return type(value) is str
+    elif get_origin(target_type) in (list, set):
+        if not (type(value) == list or isinstance(value, ColumnTable)):
+            # A single value or "" for an empty list
+            value = [value] if value != "" else []
+        item_type = get_args(target_type)[0]
+        return all(_matches(item, item_type) for item in value)
+    elif target_type is dict or isinstance(target_type, type):
+        # The fields of classes are checked when they are converted
+        return isinstance(value, (Mapping, target_type))
+    return True
+
+
+class _ClassConverter:
+    """
+    Internal class turning dictionaries into objects of a class. The type hints
+    and default values of the class are looked up the first time it is used,
+    along with the converters for its fields and its rewriting function.
+    """
+
+    def __init__(self, target_class):
+        self.target_class = target_class
+        self.fields = None
+        self.validators = None
+
+    def _compile(self):
+        target_class = self.target_class
+        self.rewrite = getattr(target_class, "_rewrite_fn", None)
+        hints = get_type_hints(target_class)
+        if dataclasses.is_dataclass(target_class):
+            # Classes with slots don't keep the default values as attributes
+            self.defaults = {
+                field.name: field.default
+                for field in dataclasses.fields(target_class)
+                if field.default is not dataclasses.MISSING
+            }
+        else:
+            self.defaults = {
+                name: getattr(target_class, name)
+                for name in hints.keys()
+                if hasattr(target_class, name)
+            }
+        self.hints = hints
+        self.plain_init = _plain_inits.get(target_class)
+        self.fields = {name: _converter(hint) for name, hint in hints.items()}
+
+    def __call__(self, value, name=""):
+        # Maybe we're already good
+        if isinstance(value, self.target_class):
+            return value
+
+        # "General" case. Convert arguments to the requested types
+        if self.fields is None:
+            self._compile()
+        fields = self.fields
+
+        # Check for unknown keys
+        unknown = value.keys() - fields.keys()
+        if unknown:
+            names = '", "'.join(unknown)
+            raise ValueError(
+                f'Type {self.target_class.__name__} has no field called "{names}"'
+            )
+
+        if _validating.get():
+            self._check(value)
+
+        # Start from the default values and insert provided arguments
+        args = self.defaults.copy()
+        for field, val in value.items():
+            args[field] = fields[field](val, field)
+        if _trusted and self.plain_init is not None:
+            # Bypass the checks of typeguard
+            obj = self.target_class.__new__(self.target_class)
+            self.plain_init(obj, **args)
+            return obj
+        return self.target_class(**args)
+
+    def _check(self, value):
+        """
+        Checks that the values in the data have the types of the fields before
+        they are converted. Like Freeciv, this doesn't accept numbers for
+        strings or booleans for numbers, for instance.
+        """
+        for field, val in value.items():
+            hint = self.hints[field]
+            if not _matches(val, hint):
+                raise TypeCheckError(
+                    f"{self.target_class.__name__}.{field}: "
+                    f"{val!r} cannot be used as {getattr(hint, '__name__', hint)}"
+                )
+
+    def validate(self, obj, seen):
+        """
+        Checks the fields of an object of the class, along with the objects
+        they contain. See validate().
+        """
+        if self.validators is None:
+            if self.fields is None:
+                self._compile()
+            prefix = self.target_class.__name__
+            self.validators = [
+                (
+                    field,
+                    f"{prefix}.{field}",
+                    self.defaults.get(field, 0) is None,
+                    _validator(hint),
+                )
+                for field, hint in self.hints.items()
+            ]
+
+        if not self.validators:
+            # Classes without type hints, like the settings of rulesets, hold
+            # objects that have some
+            for value in getattr(obj, "__dict__", {}).values():
+                _validate_contents(value, seen)
+        for field, name, none_ok, check in self.validators:
+            value = getattr(obj, field, None)
+            if value is None and none_ok:
+                # Fields left to their default None
+                continue
+            check(value, name, seen)
+
+    def from_section(self, section):
+        """
+        Converts a section, applying the rewriting function of the class.
+        """
+        if self.fields is None:
+            self._compile()
+        if self.rewrite is not None:
+            if not isinstance(section, MutableMapping):
+                # Rewriting functions modify the section
+                section = dict(section)
+            section = self.rewrite(section)
+        return self(section)
+
+
+def _compile(target_class):
+    """
+    Returns a function converting values to target_class. It takes the value
+    and the name of the field being converted.
+    """
     # A few supported "primitive" types
     if target_class in (bool, dict, float, int, str):
-        return target_class(value)
+        return lambda value, name="": target_class(value)
+    elif target_class is object:
+        return lambda value, name="": value
     elif hasattr(target_class, "wrapped"):
         # NamedReference
-        return str(value)
+        return lambda value, name="": str(value)
     elif hasattr(target_class, "__origin__"):
         # Generic class
         origin, args = get_origin(target_class), get_args(target_class)
         if origin == list:  # List[X]
-            return _list_from_value(value, args[0])
+            convert_item = _converter(args[0])
+            return lambda value, name="": _list_from_value(value, convert_item)
         elif origin == set:  # Set[X]
-            return set(_list_from_value(value, args[0]))
+            convert_item = _converter(args[0])
+            return lambda value, name="": set(_list_from_value(value, convert_item))
 
-    # Maybe we're already good
-    try:  # try/catch for control flow :(
-        if typeguard_version == 3:
-            check_type(value, target_class)
-        else:
-            check_type(name, value, target_class)
-        return value
-    except TypeCheckError:
-        ...
-
-    # "General" case. Convert arguments to the requested types
-
-    # Check for unknown keys
-    hints = get_type_hints(target_class)
-    unknown = value.keys() - hints.keys()
-    if unknown:
-        fields = '", "'.join(unknown)
-        raise ValueError(f'Type {target_class.__name__} has no field called "{fields}"')
-
-    # Fetch default values
-    args = {
-        name: getattr(target_class, name)
-        for name in hints.keys()
-        if hasattr(target_class, name)
-    }
-
-    # Insert provided arguments
-    args.update(
-        {
-            name: _instance_from_value(val, hints[name], name)
-            for name, val in value.items()
-        }
-    )
+    if isinstance(target_class, type):
+        return _ClassConverter(target_class)
+    # Unions and other special forms are not converted
+    return _checked(target_class)
 
-    return target_class(**args)
 
+# Converters returned by _compile(), by target class
+_converters = {}
 
-def read_sections(section_class, sections):
+
+def _converter(target_class):
+    """
+    Returns the function converting values to target_class, compiling it the
+    first time a class is seen.
+    """
+    converter = _converters.get(target_class)
+    if converter is None:
+        converter = _converters[target_class] = _compile(target_class)
+    return converter
+
+
+def _instance_from_value(value, target_class, name=""):
+    return _converter(target_class)(value, name)
+
+
+def _check_section_class(section_class):
     if not hasattr(section_class, "_section_regex"):
         raise TypeError("Cannot find the section regex")
 
+
+def _convert_sections(section_class, sections):
+    """
+    Converts sections known to match the regex of section_class.
+    """
+    convert = _converter(section_class).from_section
     result = []
     for section in sections:
-        if section_class._section_regex.match(section.name):
-            logging.debug(f'Processing section "%s"', section.name)
-            fields = list(
-                filter(lambda name: not name.startswith("_"), dir(section_class))
-            )
-            default_values = {name: getattr(section_class, name) for name in fields}
-            annotations = section_class.__annotations__
-
-            if hasattr(section_class, "_rewrite_fn"):
-                section = section_class._rewrite_fn(section)
-
-            result.append(_instance_from_value(section, section_class))
+        logging.debug(f'Processing section "%s"', section.name)
+        result.append(convert(section))
     return result
 
 
-def read_section(section_class, sections, *, missing_ok=False):
-    all_results = list(read_sections(section_class, sections))
+def _single(section_class, results, missing_ok):
+    """
+    Returns the only object in results. See read_section().
+    """
     pattern = section_class._section_regex.pattern
-    if not all_results:
+    if not results:
         if missing_ok:
             return None
         else:
             raise ValueError(f'No section matching "{pattern}" was found')
-    if len(all_results) > 1:
+    if len(results) > 1:
         raise ValueError(
             f'Several sections matching "{pattern}" were found, expected only one'
         )
-    return all_results[0]
+    return results[0]
+
+
+def read_sections(section_class, sections):
+    _check_section_class(section_class)
+    regex = section_class._section_regex
+    return _convert_sections(
+        section_class, [section for section in sections if regex.match(section.name)]
+    )
+
+
+def read_section(section_class, sections, *, missing_ok=False):
+    return _single(section_class, read_sections(section_class, sections), missing_ok)
 
 
 def read_named_sections(section_class, sections):
     return {obj.name: obj for obj in read_sections(section_class, sections)}
+
+
+def _invalid(value, hint, name):
+    """
+    Returns the error raised by validators.
+    """
+    hint_name = getattr(hint, "__name__", hint)
+    return TypeCheckError(f"{name}: {value!r} is not {hint_name}")
+
+
+def _compile_validator(hint):
+    """
+    Returns a function checking that values have the type given by a type
+    hint, along with the fields of the objects they contain. It takes the
+    value, the name of the field and the ids of the objects already checked.
+    """
+    origin = get_origin(hint)
+    if hasattr(hint, "wrapped"):
+        # NamedReference, possibly replaced with the object it names
+        wrapped = hint.wrapped
+
+        def check(value, name, seen):
+            if type(value) is not str and type(value).__name__ != wrapped:
+                raise _invalid(value, hint, name)
+
+    elif origin in (list, set):
+        check_item = _validator(get_args(hint)[0])
+
+        def check(value, name, seen):
+            item_name = f"{name}[]"
+            if isinstance(value, origin):
+                for item in value:
+                    check_item(item, item_name, seen)
+            elif isinstance(value, (dict, list, set, tuple)):
+                raise _invalid(value, hint, name)
+            else:
+                # Like in files, a single value stands for a list, for
+                # instance help texts joined into one string
+                check_item(value, item_name, seen)
+
+    elif origin is dict:
+        check_key, check_item = map(_validator, get_args(hint))
+
+        def check(value, name, seen):
+            if not isinstance(value, dict):
+                raise _invalid(value, hint, name)
+            for key, item in value.items():
+                check_key(key, f"{name}[]", seen)
+                check_item(item, f"{name}[{key!r}]", seen)
+
+    elif isinstance(hint, type):
+        types = (int, float) if hint is float else hint
+        nested = hint not in (bool, dict, float, int, object, str)
+
+        def check(value, name, seen):
+            if not isinstance(value, types):
+                raise _invalid(value, hint, name)
+            if nested:
+                _validate_object(value, seen)
+
+    else:
+        # Unions and other special forms
+        checked = _checked(hint)
+
+        def check(value, name, seen):
+            try:
+                checked(value, name)
+            except TypeCheckError:
+                raise _invalid(value, hint, name) from None
+
+    return check
+
+
+# Functions returned by _compile_validator(), by type hint
+_validators = {}
+
+
+def _validator(hint):
+    """
+    Returns the function checking values against a type hint, compiling it
+    the first time a hint is seen.
+    """
+    validator = _validators.get(hint)
+    if validator is None:
+        validator = _validators[hint] = _compile_validator(hint)
+    return validator
+
+
+def _validate_contents(value, seen):
+    """
+    Checks the objects in a container, or the object itself if it isn't one.
+    """
+    if isinstance(value, dict):
+        value = value.values()
+    elif not isinstance(value, (list, set, tuple)):
+        if type(value) not in (bool, float, int, str, type(None)):
+            _validate_object(value, seen)
+        return
+    for item in value:
+        _validate_contents(item, seen)
+
+
+def _validate_object(obj, seen):
+    """
+    Checks the fields of an object. See validate().
+    """
+    if id(obj) in seen:
+        return
+    seen.add(id(obj))
+    _converter(type(obj)).validate(obj, seen)
+
+
+def validate(obj):
+    """
+    Checks that the fields of an object have the types given by the type hints
+    of its class, and the same for the objects it contains. This is the
+    validation skipped by the trusted mode, as a separate pass:
+
+        set_trusted(True)
+        ruleset = Ruleset(name, path)
+        validate(ruleset)
+
+    Lists and dictionaries of objects, as returned by read_sections() and
+    read_named_sections(), are also accepted. A TypeCheckError is raised for
+    the first field of the wrong type. Unlike validating(), this checks the
+    objects after conversion, so numbers read for strings are accepted, for
+    instance.
+    """
+    _validate_contents(obj, set())
+
+
+class SectionRouter:
+    """
+    Sorts sections between several classes annotated with @section. The
+    regular expressions of the classes are combined, so every section is
+    matched once instead of once per class.
+
+    A section matching the regex of several classes is an error, unless
+    first_match is set: it then goes to the first class in the list.
+    """
+
+    def __init__(self, section_classes, *, first_match=False):
+        for section_class in section_classes:
+            _check_section_class(section_class)
+        self.section_classes = list(section_classes)
+        self.first_match = first_match
+
+        patterns = [cls._section_regex.pattern for cls in self.section_classes]
+        # One regex for each class and the ones after it. The first one finds
+        # the class of a section, and the next one checks for conflicts.
+        self._regexes = [
+            re.compile(
+                "|".join(
+                    f"(?P<_{i}>{pattern})"
+                    for i, pattern in enumerate(patterns)
+                    if i >= start
+                )
+            )
+            for start in range(len(patterns))
+        ]
+        self._regexes.append(None)
+
+    def route(self, sections):
+        """
+        Sorts sections, returning a RoutedSections. Sections that match no
+        class are ignored.
+        """
+        classes = self.section_classes
+        groups = {section_class: [] for section_class in classes}
+        regex = self._regexes[0]
+        if regex is None:
+            return RoutedSections(groups)
+
+        for section in sections:
+            match = regex.match(section.name)
+            if match is None:
+                continue
+            index = int(match.lastgroup[1:])
+            if not self.first_match:
+                other = self._regexes[index + 1]
+                other = other and other.match(section.name)
+                if other:
+                    raise ValueError(
+                        f'Section "{section.name}" matches both '
+                        f"{classes[index].__name__} and "
+                        f"{classes[int(other.lastgroup[1:])].__name__}"
+                    )
+            groups[classes[index]].append(section)
+        return RoutedSections(groups)
+
+
+class RoutedSections:
+    """
+    The sections sorted by a SectionRouter. The methods work like the
+    functions with the same names, for one of the classes of the router.
+    """
+
+    def __init__(self, groups):
+        self._groups = groups
+
+    def sections(self, section_class):
+        """
+        Returns the sections for a class, without converting them.
+        """
+        return self._groups[section_class]
+
+    def read_sections(self, section_class):
+        return _convert_sections(section_class, self._groups[section_class])
+
+    def read_section(self, section_class, *, missing_ok=False):
+        results = self.read_sections(section_class)
+        return _single(section_class, results, missing_ok)
+
+    def read_named_sections(self, section_class):
+        return {obj.name: obj for obj in self.read_sections(section_class)}
@@ -13,45 +13,87 @@
 # You should have received a copy of the GNU General Public License
 # along with pyciv.  If not, see <https://www.gnu.org/licenses/>.
 
+import copy
+import logging
 import re
+import sys
+import threading
 
 import ply.yacc
 
+from .bulk import load_many
+from .cache import load_cached
+from .compact import CompactSectionBuilder
+from .index import load_section
 from .lexer import SpecLexer
+from .table import _Table
+
+_log = logging.getLogger(__name__)
+
+# Serializes the construction of parser templates
+_template_lock = threading.Lock()
 
 _newline_magic = {}
 _translation_domain_regex = re.compile(r"\?\w+:(.*)", re.DOTALL)
 
 _string_escape_regex = re.compile(r"\\(.)", re.DOTALL)
 
+# Longest string value that is interned
+_MAX_INTERNED_LENGTH = 32
+
 
 def _string_escape_replace(match):
     escapes = {"n": "\n", "\n": ""}
     return escapes.get(match.group(1), match.group(1))
 
 
-class _Table:
+def _scalar_value(value):
     """
-    Internal class used to represent table constructs in the input file. Turned
-    into a list of dicts using to_list() when assigned to a value.
+    Turns the value of a scalar token into the value stored in sections.
     """
+    if type(value) is str:
+        # Drop the translation domain prefix if present
+        match = _translation_domain_regex.match(value)
+        if match:
+            value = match.group(1)
+        # Resolve escaped characters
+        value = _string_escape_regex.sub(_string_escape_replace, value)
+        # Share the many copies of names used as enumeration values
+        if len(value) <= _MAX_INTERNED_LENGTH and value.isidentifier():
+            value = sys.intern(value)
+    return value
+
+
+class _SectionFeeder:
+    """
+    Internal class presenting the tokens of a single section to the PLY parser.
+    The end of the section is reported as the end of the input, and the header
+    of the next section is kept in next_header.
 
-    def __init__(self, columns):
-        self.columns = columns
-        self.rows = list()
+    The grammar actions are shared and read the options of the parser from
+    here.
+    """
 
-    def __repr__(self):
-        return f"Table({self.columns}, {len(self.rows)})"
+    def __init__(self, lexer, first):
+        self.next_header = None
+        self.columnar = lexer._columnar
+        self.section_class = CompactSectionBuilder if lexer._compact else Section
+        self._lexer = lexer
+        self._first = first
 
-    def to_list(self):
+    def token(self):
         """
-        Turns the table into a list of dictionaries.
+        Returns the next token of the section, or None.
         """
+        if self._first is not None:
+            token, self._first = self._first, None
+            return token
 
-        def make_object(row):
-            return {name: value for name, value in zip(self.columns, row)}
-
-        return [make_object(row) for row in self.rows]
+        token = self._lexer.token()
+        if token is not None and token.type == "SECTION_HEADER":
+            self.next_header = token
+            return None
+        return token
 
 
 class Section(dict):
@@ -144,6 +186,7 @@ class SpecParser(SpecLexer):
             | section
             | nl section
         """
+        # Lists are extended in place to keep parsing linear in their length
         if len(p) == 2:
             # section
             p[0] = [p[1]]
@@ -155,7 +198,8 @@ class SpecParser(SpecLexer):
             p[0] = p[1]
         else:
             # file section or file incluse
-            p[0] = p[1] + [p[2]]
+            p[1].append(p[2])
+            p[0] = p[1]
 
     def p_nl(self, p):  # New line (collapsing)
         r"""
@@ -185,14 +229,7 @@ class SpecParser(SpecLexer):
             | NUMBER
             | BOOLEAN
         """
-        if type(p[1]) is str:
-            # Drop the translation domain prefix if present
-            match = _translation_domain_regex.match(p[1])
-            if match:
-                p[1] = match.group(1)
-            # Resolve escaped characters
-            p[1] = _string_escape_regex.sub(_string_escape_replace, p[1])
-        p[0] = p[1]
+        p[0] = _scalar_value(p[1])
 
     def p_list(self, p):
         """
@@ -202,7 +239,8 @@ class SpecParser(SpecLexer):
             | scalar ',' nl scalar
         """
         if isinstance(p[1], list):
-            p[0] = p[1] + [p[len(p) - 1]]
+            p[1].append(p[len(p) - 1])
+            p[0] = p[1]
         else:
             p[0] = [p[1], p[len(p) - 1]]
 
@@ -213,7 +251,8 @@ class SpecParser(SpecLexer):
         """
         if isinstance(p[1], list):
             # Second line
-            p[0] = p[1] + [p[len(p) - 1]]
+            p[1].append(p[len(p) - 1])
+            p[0] = p[1]
         else:
             # First line
             p[0] = [p[1]]
@@ -230,7 +269,7 @@ class SpecParser(SpecLexer):
         else:
             # Second or third lines
             p[0] = p[1]
-            p[0].rows += [p[len(p) - 1]]
+            p[0].rows.append(p[len(p) - 1])
 
     def p_table(self, p):
         """
@@ -246,6 +285,9 @@ class SpecParser(SpecLexer):
             # '{' table_contents...
             p[0] = p[2]
 
+        if p.lexer.columnar:
+            p[0] = p[0].to_columns()
+
     def p_value(self, p):
         """
         value : scalar
@@ -271,27 +313,83 @@ class SpecParser(SpecLexer):
         """
         if p[2] is _newline_magic:
             # First line
-            p[0] = Section(p[1])
+            p[0] = p.lexer.section_class(p[1])
         else:
             # Second line
             p[1][p[2][0]] = p[2][1]
             p[0] = p[1]
 
     def p_error(self, p):
-        self._error(p, f"unexpected token: {p.type}")
+        if p is None:
+            self._error(None, "unexpected end of file")
+        else:
+            self._error(p, f"unexpected token: {p.type}")
 
-    def __init__(self, *args):
+    def __init__(self, *args, columnar=False, compact=False, **kwargs):
         """
         Constructor. Arguments are passed to SpecLexer.
+
+        With columnar, tables are stored as ColumnTable instead of lists of
+        dictionaries. With compact, sections are read-only CompactSection
+        objects instead of Section.
         """
-        super().__init__(*args)
-        self._parser = ply.yacc.yacc(module=self)
+        super().__init__(*args, **kwargs)
+        self._columnar = columnar
+        self._compact = compact
+        # The tables are shared, but the parser stacks and the error handler
+        # belong to this instance.
+        self._parser = copy.copy(self._parser_template())
+        self._parser.errorfunc = self.p_error
+
+    @classmethod
+    def _parser_template(cls):
+        """
+        Returns the PLY parser shared by all instances of the class. The LALR
+        tables are generated in memory the first time and never written to
+        disk, so this works from read-only installations.
+
+        The grammar actions are bound to a bare instance and must not use any
+        parsing state. The tables are only read while parsing, and each
+        instance parses with its own copy of the template, so parsers can run
+        in several threads.
+        """
+        template = cls.__dict__.get("_yacc_template")
+        if template is None:
+            with _template_lock:
+                template = cls.__dict__.get("_yacc_template")
+                if template is None:
+                    template = ply.yacc.yacc(
+                        module=cls.__new__(cls),
+                        write_tables=False,
+                        debug=False,
+                        errorlog=_log,
+                    )
+                    cls._yacc_template = template
+        return template
 
     def __iter__(self):
         """
-        Returns the next section.
+        Yields the sections in the file as they are parsed.
+
+        Each section is parsed separately and returned as soon as the next
+        section header (or the end of the file) is reached, so callers that
+        stop early don't pay for the rest of the file.
         """
-        return self._parser.parse(lexer=self).__iter__()
+        try:
+            token = self.token()
+            while token is not None and token.type == "\n":
+                token = self.token()
+
+            while token is not None:
+                feeder = _SectionFeeder(self, token)
+                sections = self._parser.parse(lexer=feeder)
+                # After a syntax error, PLY drops what it couldn't parse
+                for section in sections or []:
+                    yield section.build() if self._compact else section
+                token = feeder.next_header
+        finally:
+            # Don't keep memory maps open when the caller stops early
+            self.close()
 
     def get_all(self):
         """
@@ -300,8 +398,58 @@ class SpecParser(SpecLexer):
         return [section for section in self]
 
     @classmethod
-    def load(cls, path, freeciv_path):
+    def load(cls, path, freeciv_path, *, cache_dir=None, **kwargs):
+        """
+        Loads all sections from a file. Keyword arguments are passed to the
+        constructor.
+
+        When cache_dir is given, the sections are stored there and reused
+        while the file and everything it includes keep the same contents.
+        Only use a directory you trust: entries are pickles.
+        """
+        if cache_dir is not None:
+            return load_cached(cls, path, freeciv_path, cache_dir, kwargs)
+        return cls(path, freeciv_path, **kwargs).get_all()
+
+    @classmethod
+    def load_many(cls, paths, freeciv_path, *, workers=None, **kwargs):
+        """
+        Loads several files and returns a dictionary mapping each path to its
+        sections. Keyword arguments are passed to load().
+
+        The files are parsed in a pool of worker processes, with one process
+        per CPU by default. Messages logged by the workers are logged again
+        here. Exceptions raised in a worker, other than OSError, are reported
+        as a ParseError with the file and line where parsing stopped, and
+        chained to it. With workers=1, the files are parsed one after the
+        other in this process and errors are raised as is, like with load().
+        """
+        return load_many(cls, paths, freeciv_path, workers, kwargs)
+
+    @classmethod
+    def load_section(cls, path, freeciv_path, name, **kwargs):
         """
-        Loads all sections from a file.
+        Loads the first section called name from a file or the files it
+        includes, and raises a KeyError if there is none. Keyword arguments
+        are passed to the constructor.
+
+        The position of every section is recorded in a SectionIndex the first
+        time, and only the requested section is read and parsed afterwards.
+        This saves the time needed to reach the section, not to parse it: the
+        index makes little difference for large sections, or for a single
+        lookup in a file that has no index yet.
         """
-        return cls(path, freeciv_path).get_all()
+        return load_section(cls, path, freeciv_path, name, kwargs)
+
+
+def parse(path, data_path, *, parser_class=SpecParser, **options):
+    """
+    Parses a file and returns the list of its sections. Options are passed to
+    the load() method of parser_class, which can also be DescentParser.
+
+    This function can be called from several threads at once. Every call uses
+    its own parser; what is shared between calls (the lexer and parser tables,
+    the include cache and the compiled patterns) is either read-only once
+    built or protected by a lock.
+    """
+    return parser_class.load(path, data_path, **options)
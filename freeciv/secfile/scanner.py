@@ -0,0 +1,394 @@
+# This file is part of pyciv.
+#
+# pyciv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyciv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyciv.  If not, see <https://www.gnu.org/licenses/>.
+
+import mmap
+import re
+import sys
+from collections import namedtuple
+
+from ply.lex import LexError
+
+Token = namedtuple("Token", "type value lineno lexpos lexer")
+Token.__doc__ = """
+A token produced by RegexScanner. It has the same attributes as the PLY
+LexToken, which is all the parser needs, but is much cheaper to create.
+"""
+
+# Builds a Token from a tuple without going through the Python __new__ of
+# namedtuple, which costs more than the rest of the token
+_new = tuple.__new__
+
+# The SpecLexer rules RegexScanner knows how to process
+_HANDLED = {
+    "GETTEXT_LITERAL",
+    "PLAIN_LITERAL",
+    "RAW_LITERAL",
+    "STRING_FROM_FILE",
+    "COMMENT",
+    "SECTION_HEADER",
+    "NUMBER",
+    "WHITESPACE",
+    "INCLUDE",
+    "IDENTIFIER",
+}
+
+# Groups of the master pattern that never produce a token. Whitespace with
+# line breaks is matched by the NEWLINE group instead.
+_SKIPPED = frozenset(("COMMENT", "WHITESPACE"))
+
+# Start of the next line that can end a section being skipped
+next_section_regex = re.compile(r"^(?=[ \t]*\[|\*include)", re.MULTILINE)
+next_section_regex_bytes = re.compile(rb"^(?=[ \t]*\[|\*include)", re.MULTILINE)
+
+_capturing_group_regex = re.compile(r"(?<!\\)\((?!\?)")
+
+_master_patterns = {}
+
+
+def _master_pattern(cls, binary=False):
+    """
+    Builds a single regular expression matching all the rules of the given
+    SpecLexer class, with the same results as PLY trying them in order. The
+    rules are taken from the docstrings of the t_ methods so both backends
+    always agree.
+
+    When binary is True, the pattern matches bytes instead of str.
+    """
+    pattern = _master_patterns.get((cls, binary))
+    if pattern is not None:
+        return pattern
+
+    rules = [
+        getattr(cls, name)
+        for name in dir(cls)
+        if name.startswith("t_") and name != "t_error"
+    ]
+    # PLY sorts function rules by line number
+    rules.sort(key=lambda rule: rule.__code__.co_firstlineno)
+
+    parts = {}
+    for rule in rules:
+        name = rule.__name__[2:]
+        if name not in _HANDLED:
+            raise TypeError(f"RegexScanner cannot handle the {name} rule")
+        if name == "WHITESPACE":
+            # Tell apart the whitespace producing a newline token, so the
+            # rest can be skipped without looking at it
+            parts["NEWLINE"] = r"(?P<NEWLINE>[^\S\n]*\n\s*)"
+        # Only the named groups are needed, the others just slow matching down
+        regex = _capturing_group_regex.sub("(?:", rule.__doc__)
+        parts[name] = f"(?P<{name}>{regex}\n)"
+
+    # PLY only looks at literals when no rule matches. None of the rules can
+    # start with a punctuation literal and the whitespace ones are always
+    # matched by WHITESPACE, so the literals can be tested first. The same
+    # goes for numbers, which only identifiers could also match and those
+    # come later. These are the most frequent tokens, and trying them before
+    # the other rules makes matching much faster.
+    punctuation = "".join(char for char in cls.literals if not char.isspace())
+    first = [f"(?P<literal>[{re.escape(punctuation)}])", parts.pop("NUMBER")]
+    parts = first + list(parts.values())
+
+    pattern = "|".join(parts)
+    if binary:
+        pattern = re.compile(pattern.encode("utf-8"), re.VERBOSE | re.MULTILINE)
+    else:
+        pattern = re.compile(pattern, re.UNICODE | re.VERBOSE | re.MULTILINE)
+    _master_patterns[(cls, binary)] = pattern
+    return pattern
+
+
+def _literal(scanner, value, start):
+    return _new(Token, (value, value, scanner.lineno, start, scanner))
+
+
+def _number(scanner, value, start):
+    return _new(Token, ("NUMBER", int(value), scanner.lineno, start, scanner))
+
+
+def _newline(scanner, value, start):
+    lineno = scanner.lineno
+    scanner.lineno += value.count("\n")
+    return _new(Token, ("\n", value, lineno, start, scanner))
+
+
+def _quoted_literal(scanner, value, start):
+    lineno = scanner.lineno
+    value = value[1:-1]
+    if "\n" in value:
+        scanner.lineno += value.count("\n")
+    return _new(Token, ("STRING_LITERAL", value, lineno, start, scanner))
+
+
+def _gettext_literal(scanner, value, start):
+    lineno = scanner.lineno
+    value = value[3:-2]
+    if "\n" in value:
+        scanner.lineno += value.count("\n")
+    return _new(Token, ("STRING_LITERAL", value, lineno, start, scanner))
+
+
+def _identifier(scanner, value, start):
+    lower = value.lower()
+    if lower == "true" or lower == "false":
+        token = ("BOOLEAN", lower == "true", scanner.lineno, start, scanner)
+    else:
+        token = ("IDENTIFIER", sys.intern(value), scanner.lineno, start, scanner)
+    return _new(Token, token)
+
+
+def _section_header(scanner, value, start):
+    token = ("SECTION_HEADER", sys.intern(value[1:-1]), scanner.lineno, start, scanner)
+    return _new(Token, token)
+
+
+def _string_from_file(scanner, value, start):
+    token = _new(Token, ("STRING_FROM_FILE", value, scanner.lineno, start, scanner))
+    value = scanner._owner._read_file_string(token, value[1:-1])
+    return token._replace(type="STRING_LITERAL", value=value)
+
+
+def _include(scanner, value, start):
+    return _new(Token, ("INCLUDE", value, scanner.lineno, start, scanner))
+
+
+# Builds the token for each group of the master pattern that produces one
+_handlers = {
+    "literal": _literal,
+    "NUMBER": _number,
+    "NEWLINE": _newline,
+    "PLAIN_LITERAL": _quoted_literal,
+    "RAW_LITERAL": _quoted_literal,
+    "IDENTIFIER": _identifier,
+    "GETTEXT_LITERAL": _gettext_literal,
+    "SECTION_HEADER": _section_header,
+    "STRING_FROM_FILE": _string_from_file,
+    "INCLUDE": _include,
+}
+
+
+def _decode(value):
+    """
+    Decodes the bytes of a token the way a file opened in text mode would.
+    """
+    value = value.decode("utf-8")
+    if "\r" in value:
+        value = value.replace("\r\n", "\n").replace("\r", "\n")
+    return value
+
+
+class RegexScanner:
+    """
+    An alternative to the PLY lexer used by SpecLexer for each file.
+
+    PLY creates a LexToken and calls a Python function for every token,
+    including whitespace and comments. This scanner runs one compiled pattern
+    over the data, skips whitespace and comments without building anything
+    and only produces Token tuples for what the parser needs. It exposes the
+    same token() method and lexdata, lexpos and lineno attributes as a PLY
+    lexer, so SpecLexer can use either.
+
+    The data can also be bytes or a memory map of a UTF-8 file. Only the
+    values of the tokens that are returned are decoded.
+    """
+
+    def __init__(self, owner, data):
+        """
+        Prepares to scan data. The owner is the SpecLexer that uses the
+        scanner; its rules define the syntax and it reports errors.
+        """
+        self.lexdata = data
+        self.lexpos = 0
+        self.lineno = 1
+        self._owner = owner
+        self._binary = not isinstance(data, str)
+        self._master = _master_pattern(type(owner), self._binary)
+
+    def token(self):
+        """
+        Returns the next token, or None at the end of the data.
+        """
+        data = self.lexdata
+        match = self._master.match
+        pos = self.lexpos
+        while True:
+            m = match(data, pos)
+            if m is None:
+                if pos < len(data):
+                    self._illegal_character(pos)
+                self.lexpos = pos
+                self.close()
+                return None
+            kind = m.lastgroup
+            if kind not in _SKIPPED:
+                break
+            pos = m.end()
+
+        self.lexpos = m.end()
+        value = m.group()
+        if self._binary:
+            value = _decode(value)
+        return _handlers[kind](self, value, pos)
+
+    def close(self):
+        """
+        Releases the memory map being scanned, if any. This is done at the end
+        of the data; call it to stop earlier. No tokens can be read afterwards.
+        """
+        if isinstance(self.lexdata, mmap.mmap):
+            self.lexdata.close()
+            self.lexdata = b""
+
+    def skip_section(self):
+        """
+        Moves to the next line starting with a section header or an *include,
+        without producing any tokens. See SpecLexer._skip_section().
+        """
+        data = self.lexdata
+        if self._binary:
+            match = next_section_regex_bytes.search(data, self.lexpos)
+            end = match.start() if match else len(data)
+            # Memory maps don't have count()
+            self.lineno += data[self.lexpos : end].count(b"\n")
+        else:
+            match = next_section_regex.search(data, self.lexpos)
+            end = match.start() if match else len(data)
+            self.lineno += data.count("\n", self.lexpos, end)
+        self.lexpos = end
+
+    def _illegal_character(self, pos):
+        """
+        Reports an illegal character at pos the way PLY does.
+        """
+        self.lexpos = pos
+        rest = self.lexdata[pos:]
+        char = rest[:1]
+        if self._binary:
+            rest = rest.decode("utf-8", "replace")
+            char = char.decode("utf-8", "backslashreplace")
+        self._owner.t_error(Token("error", rest, self.lineno, pos, self))
+        raise LexError("Scanning error. Illegal character '%s'" % char, rest)
+
+
+class StreamScanner(RegexScanner):
+    """
+    A RegexScanner reading its data from a text stream, such as a compressed
+    file being decompressed, instead of having all of it in memory.
+
+    The stream is read in chunks of chunk_size characters. A match is only
+    trusted once the line it ends on is complete in the buffer, so tokens are
+    never cut at chunk boundaries. Consumed lines are dropped from the buffer,
+    and positions are relative to the buffer.
+    """
+
+    chunk_size = 1 << 16
+
+    def __init__(self, owner, stream):
+        """
+        Prepares to scan the stream, which is closed at the end.
+        """
+        self._stream = stream
+        self._eof = False
+        self._last_newline = -1
+        super().__init__(owner, "")
+
+    def close(self):
+        """
+        Closes the stream. No tokens can be read afterwards.
+        """
+        self._eof = True
+        self._stream.close()
+        self.lexdata = ""
+        self.lexpos = 0
+
+    def _fill(self):
+        """
+        Drops the lines before the current position from the buffer and
+        appends the next chunk of the stream. Returns False at the end of the
+        stream.
+        """
+        if self._eof:
+            return False
+
+        data = self.lexdata
+        # Keep the current line for error messages
+        line_start = data.rfind("\n", 0, self.lexpos) + 1
+        # Read at least as much as is kept so long lines take linear time
+        chunk = self._stream.read(max(self.chunk_size, len(data) - line_start))
+        if not chunk:
+            self._eof = True
+            self._stream.close()
+        self.lexdata = data[line_start:] + chunk
+        self.lexpos -= line_start
+        self._last_newline = self.lexdata.rfind("\n")
+        return True
+
+    def _complete(self, match):
+        """
+        Checks whether a match is known to be the same as the one on the full
+        data.
+        """
+        if self._eof:
+            return True
+        if match is None or match.end() > self._last_newline:
+            return False
+        # A gettext literal that isn't complete yet would match as an
+        # identifier
+        return not (
+            match.lastgroup == "IDENTIFIER"
+            and self.lexdata.startswith('_("', match.start())
+        )
+
+    def skip_section(self):
+        """
+        Moves to the next line starting with a section header or an *include,
+        without producing any tokens. See SpecLexer._skip_section().
+        """
+        while True:
+            data = self.lexdata
+            match = next_section_regex.search(data, self.lexpos)
+            if match and (self._eof or match.start() <= self._last_newline):
+                end = match.start()
+                break
+            # Skip the complete lines and read more
+            end = self._last_newline + 1 if not self._eof else len(data)
+            end = max(end, self.lexpos)
+            self.lineno += data.count("\n", self.lexpos, end)
+            self.lexpos = end
+            if not self._fill():
+                break
+        self.lineno += self.lexdata.count("\n", self.lexpos, end)
+        self.lexpos = end
+
+    def token(self):
+        """
+        Returns the next token, or None at the end of the stream. Data is
+        read from the stream as needed.
+        """
+        master = self._master
+        while True:
+            match = master.match(self.lexdata, self.lexpos)
+            if not self._complete(match):
+                self._fill()
+                continue
+            if match is None:
+                if self.lexpos < len(self.lexdata):
+                    self._illegal_character(self.lexpos)
+                return None
+            start = self.lexpos
+            self.lexpos = match.end()
+            kind = match.lastgroup
+            if kind not in _SKIPPED:
+                return _handlers[kind](self, match.group(), start)
@@ -0,0 +1,163 @@
+# This file is part of pyciv.
+#
+# pyciv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyciv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyciv.  If not, see <https://www.gnu.org/licenses/>.
+
+import sys
+from array import array
+from collections.abc import Mapping, Sequence
+
+
+def _column(values):
+    """
+    Returns a compact container for the values of a column: an array for
+    integers, or a list.
+    """
+    if values and all(type(value) is int for value in values):
+        try:
+            return array("q", values)
+        except OverflowError:
+            pass
+    return list(values)
+
+
+class RowView(Mapping):
+    """
+    A read-only dictionary view of one row of a ColumnTable.
+    """
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, name):
+        return self._table._columns[name][self._index]
+
+    def __iter__(self):
+        return iter(self._table._columns)
+
+    def __len__(self):
+        return len(self._table._columns)
+
+    def __repr__(self):
+        return f"RowView({dict(self)!r})"
+
+
+class ColumnTable(Sequence):
+    """
+    A table from a spec file stored column by column, as produced by parsers
+    created with columnar=True.
+
+    Each column is a list, or an array for integer columns, so no object is
+    created per row. The table still behaves as the list of dictionaries
+    produced by default: indexing and iterating give RowView mappings built on
+    the fly, and a ColumnTable compares equal to the corresponding list.
+    """
+
+    def __init__(self, columns):
+        """
+        Creates a table from a dictionary mapping column names to lists of
+        values of the same length.
+        """
+        self._columns = {name: _column(values) for name, values in columns.items()}
+        self._length = len(next(iter(self._columns.values()), ()))
+
+    @property
+    def names(self):
+        """
+        The names of the columns.
+        """
+        return tuple(self._columns)
+
+    def column(self, name):
+        """
+        Returns the values in a column.
+        """
+        return self._columns[name]
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [RowView(self, i) for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("table index out of range")
+        return RowView(self, index)
+
+    def __eq__(self, other):
+        if isinstance(other, ColumnTable):
+            return self.to_list() == other.to_list()
+        if isinstance(other, list):
+            return self.to_list() == other
+        return NotImplemented
+
+    def __repr__(self):
+        return f"ColumnTable({list(self._columns)}, {self._length})"
+
+    def to_list(self):
+        """
+        Turns the table into a list of dictionaries.
+        """
+        names = list(self._columns)
+        return [dict(zip(names, row)) for row in zip(*self._columns.values())]
+
+
+class _Table:
+    """
+    Internal class used to represent table constructs in the input file. Turned
+    into a list of dicts using to_list() when assigned to a value.
+    """
+
+    def __init__(self, columns):
+        self.columns = columns
+        self.rows = list()
+
+    def __repr__(self):
+        return f"Table({self.columns}, {len(self.rows)})"
+
+    def to_list(self):
+        """
+        Turns the table into a list of dictionaries.
+        """
+
+        # The rows share the column names
+        columns = [sys.intern(name) for name in self.columns]
+
+        def make_object(row):
+            if type(row) is not list:
+                # Rows of a single value are scalars
+                row = (row,)
+            return {name: value for name, value in zip(columns, row)}
+
+        return [make_object(row) for row in self.rows]
+
+    def to_columns(self):
+        """
+        Turns the table into a ColumnTable. Tables with rows of the wrong
+        length cannot be stored by column and are turned into lists.
+        """
+        columns = [sys.intern(name) for name in self.columns]
+        rows = self.rows
+        if len(columns) == 1 and not any(type(row) is list for row in rows):
+            # Rows of a single value are scalars
+            return ColumnTable({columns[0]: rows})
+        if not all(type(row) is list and len(row) == len(columns) for row in rows):
+            return self.to_list()
+        if not rows:
+            return ColumnTable({name: [] for name in columns})
+        return ColumnTable(dict(zip(columns, zip(*rows))))
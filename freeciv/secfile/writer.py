@@ -0,0 +1,207 @@
+# This file is part of pyciv.
+#
+# pyciv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyciv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyciv.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import re
+from collections.abc import Mapping
+
+from .compressed import compression_from_extension, open_compressed
+from .table import ColumnTable
+
+# Names that the lexer reads as a single IDENTIFIER
+_name_regex = re.compile(r"(?!\d)\w+")
+
+# Characters that cannot appear in a table header, which is not unescaped
+_header_regex = re.compile(r'["\\\r\n]')
+
+
+def _check_name(name):
+    """
+    Raises a ValueError if name cannot be written as (part of) an entry name.
+    """
+    if (
+        type(name) is not str
+        or not _name_regex.fullmatch(name)
+        or name.lower() in ("true", "false")
+    ):
+        raise ValueError(f"cannot write an entry called {name!r}")
+
+
+def _string(value):
+    """
+    Returns a string literal that the parsers read back as value.
+    """
+    if "\r" in value:
+        # Read back as a line break, the lexer has no escape for it
+        raise ValueError("cannot write a string containing a carriage return")
+    value = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    if value.startswith("?"):
+        # Would be taken for a translation domain
+        value = "\\" + value
+    if value.endswith("\\"):
+        # The lexer doesn't accept a backslash before the closing quote, add an
+        # escaped line break that is dropped when reading
+        value += "\\\n"
+    return f'"{value}"'
+
+
+def _scalar(value):
+    """
+    Returns the representation of a string, integer or boolean.
+    """
+    kind = type(value)
+    if kind is str:
+        return _string(value)
+    elif kind is bool:
+        return "TRUE" if value else "FALSE"
+    elif kind is int:
+        return str(value)
+    raise ValueError(f"cannot write a value of type {kind.__name__}")
+
+
+def _row(values):
+    """
+    Returns a list of scalars separated by commas.
+    """
+    return ", ".join([_scalar(value) for value in values])
+
+
+def _table(names, rows):
+    """
+    Returns a table with the given column names and rows of values.
+    """
+    for name in names:
+        if type(name) is not str or _header_regex.search(name):
+            raise ValueError(f"cannot write a column called {name!r}")
+    lines = ["{ " + ", ".join([f'"{name}"' for name in names])]
+    lines += ["  " + _row(row) for row in rows]
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def _list(value):
+    """
+    Returns the representation of a list of scalars or dictionaries.
+    """
+    if not value:
+        # A table without columns or rows is read as an empty list
+        return '{ "" }'
+    if not isinstance(value[0], Mapping):
+        return _row(value)
+
+    keys = value[0].keys()
+    names = list(keys)
+    rows = []
+    for row in value:
+        if not isinstance(row, Mapping) or row.keys() != keys:
+            raise ValueError("cannot write a table with rows of different shapes")
+        rows.append([row[name] for name in names])
+    return _table(names, rows)
+
+
+def _value(value):
+    """
+    Returns the representation of any value that can be stored in a section.
+    """
+    if type(value) is ColumnTable:
+        names = value.names
+        return _table(names, zip(*[value.column(name) for name in names]))
+    elif isinstance(value, (list, tuple)):
+        return _list(value)
+    return _scalar(value)
+
+
+def _entries(lines, prefix, section):
+    """
+    Appends the entries of a section to lines, with nested mappings written
+    using qualified names.
+    """
+    for name, value in section.items():
+        _check_name(name)
+        if isinstance(value, Mapping):
+            _entries(lines, f"{prefix}{name}.", value)
+        else:
+            lines.append(f"{prefix}{name} = {_value(value)}")
+
+
+class SpecWriter:
+    """
+    Writes sections in the format read by SpecParser.
+
+    Sections can be Section or CompactSection objects or any other mapping
+    with a name attribute. Nested mappings are written using qualified names
+    (a.b.c), lists of dictionaries and ColumnTable objects as tables, and other
+    lists as lists of values. Strings are escaped so they are read back
+    unchanged.
+
+    Some values are read back differently: lists of a single value are read
+    as this value, and tuples as lists. Values that cannot be written at all,
+    such as floats, names that are not identifiers or strings with carriage
+    returns, raise a ValueError.
+
+    Each section is written as soon as it is passed to the writer, so large
+    files don't need to be kept in memory.
+    """
+
+    def __init__(self, file):
+        """
+        Creates a writer for a file object opened in text mode, or for a path.
+        Files with a .gz, .bz2, .xz or .zst extension are compressed.
+        """
+        if isinstance(file, (str, os.PathLike)):
+            compression = compression_from_extension(os.fspath(file))
+            if compression is None:
+                self._file = open(file, "w", encoding="utf-8")
+            else:
+                self._file = open_compressed(file, compression, "wt")
+            self._owned = True
+        else:
+            self._file = file
+            self._owned = False
+        self._first = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """
+        Closes the file if it was opened by the writer.
+        """
+        if self._owned:
+            self._file.close()
+
+    def write_section(self, section):
+        """
+        Writes a section.
+        """
+        if "\n" in section.name or "\r" in section.name:
+            raise ValueError(f"cannot write a section called {section.name!r}")
+
+        # Sections are separated by an empty line
+        lines = [f"[{section.name}]"] if self._first else ["", f"[{section.name}]"]
+        _entries(lines, "", section)
+        lines.append("")
+        self._file.write("\n".join(lines))
+        self._first = False
+
+    def write_all(self, sections):
+        """
+        Writes all sections from an iterable, for instance a parser.
+        """
+        for section in sections:
+            self.write_section(section)
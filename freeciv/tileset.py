@@ -1,14 +1,18 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 # SPDX-FileCopyrightText: Louis Moureaux <m_louis30@yahoo.com>
 
+import asyncio
+import os
+from concurrent.futures import Executor
+from contextvars import copy_context
 from dataclasses import dataclass, field
 from pathlib import Path
 
 from PIL import Image
-from typeguard import typechecked
 
-from .secfile.loader import read_section, read_sections, section
-from .secfile.parser import SpecParser
+from .secfile.datapath import DataPath
+from .secfile.loader import read_section, read_sections, section, typechecked
+from .secfile.parser import SpecParser, parse
 
 __all__ = [
     "FileData",
@@ -188,13 +192,19 @@ class Sprite:
 
     def locate(self, path, extension=".png") -> Path:
         """
-        Finds an image file to load this sprite from.
+        Finds an image file to load this sprite from. The path can be a list of
+        directories or a DataPath, such as the path of a Tileset, which lists
+        each directory once and is faster for repeated lookups.
         """
         filename = self.filename + extension
-        for location in path:
-            full_path = Path(location) / filename
-            if full_path.exists():
-                return full_path
+        if isinstance(path, DataPath):
+            full_path = path.find(filename)
+        else:
+            # Listing the directories would not pay off for a single lookup
+            candidates = (os.path.join(location, filename) for location in path)
+            full_path = next(filter(os.path.isfile, candidates), None)
+        if full_path is not None:
+            return Path(full_path)
 
         raise ValueError(f'Could not find a file called "{filename}"')
 
@@ -221,28 +231,95 @@ class Tileset:
     """
 
     name: str
+    path: DataPath
     tilespec: TilespecData
     grids: list[GridData]
     extras: list[ExtraData]
 
     sprite: dict[str, Sprite]
 
-    def __init__(self, name: str, path: str, options: set[str] = set()):
+    def __init__(
+        self, name: str, path: str, options: set[str] = set(), *, workers: int = 1
+    ):
         """
-        Reads the tileset called `name` under the data `path`.
+        Reads the tileset called `name` under the data `path`. Sprites can be
+        loaded from the same `self.path`. The files listed in the tilespec are
+        parsed by `workers` processes (see SpecParser.load_many).
         """
-
-        self.name = name
+        path = DataPath.of(path)
 
         sections = SpecParser.load(f"{name}.tilespec", path)
-        self.tilespec = read_section(TilespecData, sections)
+        tilespec = read_section(TilespecData, sections)
+
+        all_sections = SpecParser.load_many(tilespec.files, path, workers=workers)
+        self._build(name, path, options, tilespec, all_sections)
+
+    @classmethod
+    async def aload(
+        cls,
+        name: str,
+        path: str,
+        options: set[str] = set(),
+        *,
+        executor: Executor | None = None,
+    ) -> "Tileset":
+        """
+        Reads a tileset like the constructor without blocking the event loop.
+        Files are parsed concurrently in the executor, by default the one of
+        the loop. Cancelling the task cancels the files not parsed yet.
+        """
+        # Executors don't propagate context variables, run each call in a
+        # copy of the current context to keep validating() in effect
+        loop = asyncio.get_running_loop()
+        path = DataPath.of(path)
+
+        sections = await loop.run_in_executor(
+            executor, copy_context().run, parse, f"{name}.tilespec", path
+        )
+        tilespec = read_section(TilespecData, sections)
+
+        files = list(dict.fromkeys(tilespec.files))
+        results = await asyncio.gather(
+            *(
+                loop.run_in_executor(executor, copy_context().run, parse, file, path)
+                for file in files
+            )
+        )
+        return await loop.run_in_executor(
+            executor,
+            copy_context().run,
+            cls._from_sections,
+            name,
+            path,
+            options,
+            tilespec,
+            dict(zip(files, results)),
+        )
+
+    @classmethod
+    def _from_sections(cls, *args) -> "Tileset":
+        """
+        Creates a tileset from parsed files. See _build().
+        """
+        tileset = cls.__new__(cls)
+        tileset._build(*args)
+        return tileset
+
+    def _build(self, name, path, options, tilespec, all_sections):
+        """
+        Fills the tileset from the parsed tilespec and the sections of the
+        files it lists, keyed by file name.
+        """
+        self.name = name
+        self.path = path
+        self.tilespec = tilespec
 
         self.grids = []
         self.extras = []
         self.sprites = {}
 
         for spec in self.tilespec.files:
-            sections = SpecParser.load(spec, path)
+            sections = all_sections[spec]
 
             file_data = read_section(FileData, sections, missing_ok=True)
 
@@ -1,13 +1,11 @@
 from dataclasses import dataclass, field
 from warnings import warn
 
-from typeguard import typechecked
-
 from .buildings import Building
 from .effects import Requirement
 from .governments import Government
 from .science import Advance
-from .secfile.loader import NamedReference, read_named_sections, rename, section
+from .secfile.loader import NamedReference, SectionRouter, rename, section, typechecked
 
 KNOWN_UNIT_CLASS_FLAGS = {
     "TerrainSpeed",
@@ -94,7 +92,7 @@ def load_veteran_levels(
 
 @section("unitclass_.+")
 @typechecked
-@dataclass
+@dataclass(slots=True)
 class UnitClass:
     name: str
     min_speed: int
@@ -134,7 +132,7 @@ class UnitClass:
 @rename(**{"class": "uclass"})
 @section("unit_.+")
 @typechecked
-@dataclass
+@dataclass(slots=True)
 class UnitType:
     name: str
     uclass: NamedReference(UnitClass)
@@ -181,7 +179,7 @@ class UnitType:
     veteran_work_raise_chance: list[int] = None
     veteran_power_fact: list[int] = None
     veteran_move_bonus: list[int] = None
-    veteran_levels: list[str] = None  # Cannot be set from outside
+    veteran_levels: list[VeteranLevel] = None  # Cannot be set from outside
     veteran_raise_chance: list[int] = None  # AU1
 
     paratroopers_range: int = None
@@ -235,10 +233,14 @@ class UnitType:
         return self.name < other.name
 
 
+_units_router = SectionRouter([UnitClass, UnitType])
+
+
 class UnitsSettings:
     def __init__(self, sections):
-        self.unit_classes = read_named_sections(UnitClass, sections)
-        self.unit_types = read_named_sections(UnitType, sections)
+        routed = _units_router.route(sections)
+        self.unit_classes = routed.read_named_sections(UnitClass)
+        self.unit_types = routed.read_named_sections(UnitType)
 
         for section in sections:
             if "veteran_raise_chance" in section:  # compat
@@ -0,0 +1,168 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import freeciv.rules
+import freeciv.secfile.loader
+import freeciv.tileset
+from freeciv.rules import Ruleset
+from freeciv.secfile import validating
+from freeciv.tileset import Tileset
+
+TILESPEC = """
+[tilespec]
+options = "+Freeciv-tilespec-Devel-2019-Jul-03"
+name = "test"
+priority = 0
+summary = ""
+normal_tile_width = 30
+normal_tile_height = 30
+small_tile_width = 15
+small_tile_height = 20
+type = "overhead"
+is_hex = FALSE
+fog_style = "Auto"
+darkness_style = "None"
+unit_flag_offset_x = 0
+unit_flag_offset_y = 0
+city_flag_offset_x = 0
+city_flag_offset_y = 0
+occupied_offset_x = 0
+occupied_offset_y = 0
+unit_offset_x = 0
+unit_offset_y = 0
+replaced_hue = 0
+activity_offset_x = 0
+activity_offset_y = 0
+select_offset_x = 0
+select_offset_y = 0
+city_offset_x = 0
+city_offset_y = 0
+city_size_offset_x = 0
+city_size_offset_y = 0
+citybar_offset_y = 0
+tilelabel_offset_y = 0
+files = "test/grid.spec", "test/extra.spec"
+"""
+
+GRID_SPEC = """
+[file]
+gfx = "test/grid"
+
+[grid_main]
+dx = 30
+dy = 30
+tiles = { "row", "column", "tag"
+  0, 0, "t.a"
+  0, 1, "t.b"
+}
+"""
+
+EXTRA_SPEC = """
+[extra]
+sprites = { "tag", "file"
+  "t.c", "test/c"
+}
+"""
+
+
+@pytest.fixture
+def data(tmp_path):
+    (tmp_path / "test.tilespec").write_text(TILESPEC)
+    (tmp_path / "test").mkdir()
+    (tmp_path / "test" / "grid.spec").write_text(GRID_SPEC)
+    (tmp_path / "test" / "extra.spec").write_text(EXTRA_SPEC)
+    return tmp_path
+
+
+def test_tileset(data):
+    expected = Tileset("test", [data])
+    assert sorted(expected.sprites) == ["t.a", "t.b", "t.c"]
+
+    async def load_twice():
+        return await asyncio.gather(
+            Tileset.aload("test", [data]), Tileset.aload("test", [data])
+        )
+
+    for tileset in asyncio.run(load_twice()):
+        assert tileset.tilespec == expected.tilespec
+        assert tileset.grids == expected.grids
+        assert tileset.extras == expected.extras
+        assert {tag: s.location for tag, s in tileset.sprites.items()} == {
+            tag: s.location for tag, s in expected.sprites.items()
+        }
+
+
+def test_tileset_cancel(data, monkeypatch):
+    started = threading.Event()
+    release = threading.Event()
+    parse = freeciv.tileset.parse
+
+    def slow_parse(*args, **kwargs):
+        started.set()
+        release.wait()
+        return parse(*args, **kwargs)
+
+    monkeypatch.setattr(freeciv.tileset, "parse", slow_parse)
+
+    async def cancel():
+        with ThreadPoolExecutor(1) as executor:
+            task = asyncio.create_task(Tileset.aload("test", [data], executor=executor))
+            await asyncio.get_running_loop().run_in_executor(None, started.wait)
+            task.cancel()
+            release.set()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+    asyncio.run(cancel())
+
+
+def test_ruleset(monkeypatch):
+    # There is no test ruleset, only check what is parsed and built
+    parsed = []
+
+    def fake_parse(path, data_path):
+        parsed.append(path)
+        return [path]
+
+    def fake_build(self, name, sections):
+        self.name = name
+        self.sections = sections
+
+    monkeypatch.setattr(freeciv.rules, "parse", fake_parse)
+    monkeypatch.setattr(Ruleset, "_build", fake_build)
+
+    ruleset = asyncio.run(Ruleset.aload("test", []))
+    assert ruleset.name == "test"
+    assert sorted(parsed) == sorted(Ruleset._files("test").values())
+    assert ruleset.sections == {
+        kind: [file] for kind, file in Ruleset._files("test").items()
+    }
+
+
+def test_ruleset_validating(monkeypatch):
+    # The executor threads must see the validating() context
+    validated = []
+
+    def fake_parse(path, data_path):
+        validated.append(freeciv.secfile.loader._validating.get())
+        return [path]
+
+    def fake_build(self, name, sections):
+        validated.append(freeciv.secfile.loader._validating.get())
+
+    monkeypatch.setattr(freeciv.rules, "parse", fake_parse)
+    monkeypatch.setattr(Ruleset, "_build", fake_build)
+
+    async def load():
+        with validating():
+            await Ruleset.aload("test", [])
+
+    asyncio.run(load())
+    assert validated == [True] * (len(Ruleset._files("test")) + 1)
+
+    validated.clear()
+    asyncio.run(Ruleset.aload("test", []))
+    assert validated == [False] * (len(Ruleset._files("test")) + 1)
@@ -0,0 +1,55 @@
+import logging
+import pickle
+
+import pytest
+from ply.lex import LexError
+
+from freeciv.secfile import DescentParser, ParseError, SpecParser
+
+
+@pytest.fixture
+def data(tmp_path):
+    for i in range(4):
+        (tmp_path / f"file{i}.spec").write_text(f"[file_{i}]\nvalue = {i}\n")
+    (tmp_path / "bad.spec").write_text('[ok]\nvalue = 1\n*include "inc.spec"\n')
+    (tmp_path / "inc.spec").write_text("[inc]\nvalue = 1\nother = @\n")
+    (tmp_path / "broken.spec").write_text("[a]\nvalue = = 1\n")
+    return tmp_path
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+@pytest.mark.parametrize("parser", [SpecParser, DescentParser])
+def test_load_many(data, parser, workers):
+    paths = [f"file{i}.spec" for i in range(4)]
+    results = parser.load_many(paths, [data], workers=workers)
+    assert list(results) == paths
+    for path in paths:
+        assert results[path] == parser.load(path, [data])
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_errors(data, workers, caplog):
+    with pytest.raises(Exception) as info:
+        SpecParser.load_many(["file0.spec", "bad.spec"], [data], workers=workers)
+    error = info.value
+    if workers == 1:
+        # Raised as is, like by load()
+        assert type(error) is LexError
+    else:
+        assert type(error) is ParseError
+        assert "Illegal character" in error.message
+        assert error.path == "bad.spec"
+        assert error.file == str(data / "inc.spec")
+        assert error.line == 3
+        assert str(error).startswith(f"{data / 'inc.spec'}:3: ")
+        assert pickle.loads(pickle.dumps(error)).line == 3
+
+    # Missing files are not parse errors
+    with pytest.raises(FileNotFoundError):
+        SpecParser.load_many(["file0.spec", "missing.spec"], [data], workers=workers)
+
+    # Syntax errors are logged in the workers
+    caplog.clear()
+    with caplog.at_level(logging.ERROR):
+        SpecParser.load_many(["file0.spec", "broken.spec"], [data], workers=workers)
+    assert "Line 2: unexpected token: =" in caplog.messages
@@ -0,0 +1,86 @@
+import pickle
+from dataclasses import dataclass
+
+import pytest
+
+from freeciv.secfile import CompactSection, DescentParser, SpecParser
+from freeciv.secfile.loader import read_sections, rename, section
+
+SECTIONS = """
+[player0]
+name = "A"
+a.b.c = 1
+a.b.d = 2, 3
+a.e = "x"
+u = { "x", "y"
+  1, 2
+}
+[player1]
+name = "B"
+a.b.c = 4
+a.b.d = 5, 6
+a.e = "y"
+u = { "x", "y"
+  3, 4
+}
+[other]
+value = 1
+value.sub = 2
+"""
+
+
+@rename(old="new")
+@section("player")
+@dataclass
+class Player:
+    name: str
+    a: dict
+    u: list[dict]
+
+
+@pytest.fixture
+def data(tmp_path):
+    (tmp_path / "test.spec").write_text(SECTIONS)
+    return tmp_path
+
+
+@pytest.mark.parametrize("parser", [SpecParser, DescentParser])
+def test_compact(data, parser):
+    with pytest.warns(UserWarning):
+        expected = parser.load("test.spec", [data])
+    with pytest.warns(UserWarning):
+        sections = parser.load("test.spec", [data], compact=True)
+
+    assert sections == expected
+    assert [section.name for section in sections] == ["player0", "player1", "other"]
+    assert all(isinstance(section, CompactSection) for section in sections)
+
+    player0, player1, other = sections
+    assert list(player0) == ["name", "a", "u"]
+    assert list(player0["a"]) == ["b", "e"]
+    assert player0["a"]["b"] == {"c": 1, "d": [2, 3]}
+    assert "b" in player0["a"] and "c" not in player0["a"]
+    assert other["value$"] == {"sub": 2}
+    with pytest.raises(KeyError):
+        player0["b"]
+
+    # Sections with the same keys share their layout
+    assert player0._layout is player1._layout
+    copy0, copy1 = pickle.loads(pickle.dumps([player0, player1]))
+    assert copy0 == player0
+    assert copy0._layout is player0._layout
+
+
+def test_duplicate(tmp_path):
+    (tmp_path / "test.spec").write_text("[a]\nb.c = 1\nb = 2\n")
+    with pytest.raises(ValueError):
+        DescentParser.load("test.spec", [tmp_path], compact=True)
+
+
+def test_loader(data):
+    with pytest.warns(UserWarning):
+        sections = SpecParser.load("test.spec", [data], compact=True)
+    players = read_sections(Player, sections)
+    assert players[1] == Player(
+        name="B", a={"b": {"c": 4, "d": [5, 6]}, "e": "y"}, u=[{"x": 3, "y": 4}]
+    )
@@ -0,0 +1,85 @@
+import builtins
+import bz2
+import gzip
+import lzma
+import os
+
+import pytest
+
+import freeciv.secfile.compressed
+from freeciv.secfile import SpecLexer, SpecParser
+from freeciv.secfile.scanner import StreamScanner
+
+SAVEGAME = """
+[savefile]
+options = " +version3"
+
+[player0]
+name = "Caesar"
+u = { "x", "y", "type"
+      1, 2, "Warriors"
+      3, 4, "Settlers"
+    }
+
+[player1]
+name = _("Cleopatra")
+"""
+
+OPENERS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+
+
+@pytest.mark.parametrize("extension", OPENERS)
+@pytest.mark.parametrize("scanner", ["ply", "regex"])
+def test_compressed(tmp_path, extension, scanner):
+    (tmp_path / "game.sav").write_text(SAVEGAME)
+    with OPENERS[extension](tmp_path / f"game.sav{extension}", "wt") as f:
+        f.write(SAVEGAME)
+    # Detection doesn't rely on the extension
+    (tmp_path / f"game.sav{extension}").rename(tmp_path / "game")
+
+    expected = SpecParser.load("game.sav", [tmp_path])
+    assert SpecParser.load("game", [tmp_path], scanner=scanner) == expected
+
+
+def test_streaming_skip(tmp_path, monkeypatch):
+    with gzip.open(tmp_path / "game.sav.gz", "wt") as f:
+        f.write(SAVEGAME)
+
+    monkeypatch.setattr(StreamScanner, "chunk_size", 5)
+    sections = SpecParser.load(
+        "game.sav.gz", [tmp_path], scanner="regex", sections="player1"
+    )
+    assert sections == [{"name": "Cleopatra"}]
+
+
+def test_zstd_missing(tmp_path, monkeypatch):
+    (tmp_path / "game.sav.zst").write_bytes(b"\x28\xb5\x2f\xfd\x00\x00")
+
+    monkeypatch.setattr(freeciv.secfile.compressed, "zstd", None)
+    monkeypatch.setattr(freeciv.secfile.compressed, "zstandard", None)
+    with pytest.raises(ValueError, match="Zstandard support requires"):
+        SpecParser.load("game.sav.zst", [tmp_path])
+
+
+@pytest.mark.parametrize("scanner", ["ply", "regex"])
+def test_always_streamed(tmp_path, monkeypatch, scanner):
+    with gzip.open(tmp_path / "game.sav.gz", "wt") as f:
+        f.write(SAVEGAME)
+    (tmp_path / "help.txt").write_text("Help")
+    (tmp_path / "plain.spec").write_text("[a]\nhelp = *help.txt*\n")
+
+    lexer = SpecLexer("game.sav.gz", [tmp_path], scanner=scanner)
+    assert isinstance(lexer._current_lexer(), StreamScanner)
+
+    # Plain files are only opened once, compression is detected on the way
+    opened = []
+    real_open = builtins.open
+
+    def counting_open(file, *args, **kwargs):
+        opened.append(os.path.basename(file))
+        return real_open(file, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "open", counting_open)
+    sections = SpecParser.load("plain.spec", [tmp_path], scanner=scanner)
+    assert sections == [{"help": "Help"}]
+    assert sorted(opened) == ["help.txt", "plain.spec"]
@@ -0,0 +1,101 @@
+import os
+
+import pytest
+
+from freeciv.secfile import DataPath, SpecParser
+from freeciv.tileset import Sprite, SpriteData
+
+
+def test_find(tmp_path):
+    first, second = tmp_path / "first", tmp_path / "second"
+    (first / "sub").mkdir(parents=True)
+    (second / "sub").mkdir(parents=True)
+    (first / "sub" / "a.txt").write_text("first")
+    (second / "sub" / "a.txt").write_text("second")
+    (second / "b.txt").write_text("second")
+
+    path = DataPath([first, second])
+    assert list(path) == [str(first), str(second)]
+    assert path.find("sub/a.txt") == os.path.join(first, "sub/a.txt")
+    assert list(path.find_all("sub/a.txt")) == [
+        os.path.join(first, "sub/a.txt"),
+        os.path.join(second, "sub/a.txt"),
+    ]
+    assert path.find("b.txt") == os.path.join(second, "b.txt")
+    assert path.find("sub") is None
+    assert path.find("missing.txt") is None
+
+
+def test_listings_cached(tmp_path, monkeypatch):
+    scanned = []
+    scandir = os.scandir
+
+    def counting_scandir(directory):
+        scanned.append(directory)
+        return scandir(directory)
+
+    monkeypatch.setattr(os, "scandir", counting_scandir)
+
+    path = DataPath([tmp_path])
+    assert path.find("new.txt") is None
+    (tmp_path / "new.txt").write_text("")
+    assert path.find("new.txt") is None
+    assert len(scanned) == 1
+
+    path.invalidate(tmp_path)
+    assert path.find("new.txt") is not None
+    assert len(scanned) == 2
+
+
+def test_string_from_file_first_hit(tmp_path):
+    first, second = tmp_path / "first", tmp_path / "second"
+    first.mkdir()
+    second.mkdir()
+    (first / "main.spec").write_text("[a]\nhelp = *help.txt*\n")
+    (first / "help.txt").write_text("first")
+    (second / "help.txt").write_text("second")
+
+    assert SpecParser.load("main.spec", DataPath([first, second])) == [
+        {"help": "first"}
+    ]
+
+
+def test_case_insensitive(tmp_path, monkeypatch):
+    (tmp_path / "Data.txt").write_text("")
+    path = DataPath([tmp_path])
+    assert path.find("data.txt") is None
+
+    # Pretend to be on a case-insensitive file system
+    names = {name.lower() for name in os.listdir(tmp_path)}
+    monkeypatch.setattr(
+        os.path, "isfile", lambda name: os.path.basename(name).lower() in names
+    )
+    assert path.find("data.txt") == os.path.join(tmp_path, "data.txt")
+    assert path.find("other.txt") is None
+
+
+def test_sprite_locate(tmp_path, monkeypatch):
+    scanned = []
+    scandir = os.scandir
+
+    def counting_scandir(directory):
+        scanned.append(directory)
+        return scandir(directory)
+
+    monkeypatch.setattr(os, "scandir", counting_scandir)
+    (tmp_path / "a.png").write_text("")
+
+    # Plain lists are not listed, and see new files
+    sprite = Sprite(SpriteData(tag=["t"], file="b"))
+    with pytest.raises(ValueError):
+        sprite.locate([tmp_path])
+    (tmp_path / "b.png").write_text("")
+    assert sprite.locate([tmp_path]) == tmp_path / "b.png"
+    assert not scanned
+
+    # A DataPath lists each directory once
+    path = DataPath([tmp_path])
+    for name in ("a", "b", "a"):
+        sprite = Sprite(SpriteData(tag=["t"], file=name))
+        assert sprite.locate(path) == tmp_path / f"{name}.png"
+    assert len(scanned) == 1
@@ -0,0 +1,88 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from freeciv.secfile import DescentParser, SpecParser
+
+RULESET = r"""
+; A ruleset exercising most of the syntax
+[datafile]
+description = "Test ruleset"
+options     = "+Freeciv-3.0-ruleset"
+
+*include "included.ruleset"
+
+[building_barracks]
+name        = _("Barracks")
+genus       = "Improvement"
+reqs        =
+    { "type", "name", "range"
+      "Tech", "Bronze Working", "Player"
+      "Building", "Palace", "City"
+    }
+build_cost  = 30
+flags       = "VisibleByOthers",
+              "SaveSmallWonder"
+helptext    = _("\
+Line one\n\
+Line two.\
+"), "?gender:Second"
+graphic.main = "b.barracks"
+graphic.alt.old = $raw$
+empty = ""
+
+[empty]
+
+[table_rows]
+rows = { "a", "b"
+         1, 2 3, 4
+         TRUE, FALSE
+       }
+"""
+
+INCLUDED = """
+[unit_warriors]
+name = "Warriors" ; comment
+attack = -1
+"""
+
+
+def test_differential(tmp_path):
+    (tmp_path / "test.ruleset").write_text(RULESET)
+    (tmp_path / "included.ruleset").write_text(INCLUDED)
+
+    expected = SpecParser.load("test.ruleset", [tmp_path])
+    assert len(expected) == 5
+    for scanner in ("ply", "regex"):
+        sections = DescentParser.load("test.ruleset", [tmp_path], scanner=scanner)
+        assert sections == expected
+        assert [s.name for s in sections] == [s.name for s in expected]
+
+
+def test_syntax_error(tmp_path):
+    (tmp_path / "test.ruleset").write_text("[a]\nx = = 1\n")
+
+    with pytest.raises(ValueError, match="unexpected token: ="):
+        DescentParser.load("test.ruleset", [tmp_path])
+
+
+def real_files():
+    """
+    Lists the rulesets and tilesets found in $FREECIV_DATA_PATH, if any.
+    """
+    data_path = os.environ.get("FREECIV_DATA_PATH", "")
+    for location in filter(None, data_path.split(os.pathsep)):
+        for pattern in ("*/*.ruleset", "*.tilespec"):
+            for path in sorted(Path(location).glob(pattern)):
+                yield pytest.param(location, path.relative_to(location), id=str(path))
+
+
+@pytest.mark.skipif(
+    not os.environ.get("FREECIV_DATA_PATH"), reason="FREECIV_DATA_PATH is not set"
+)
+@pytest.mark.parametrize("location,name", list(real_files()))
+def test_differential_real_files(location, name):
+    data_path = os.environ["FREECIV_DATA_PATH"].split(os.pathsep)
+    expected = SpecParser.load(str(name), data_path)
+    assert DescentParser.load(str(name), data_path, scanner="regex") == expected
@@ -0,0 +1,80 @@
+import gzip
+
+import pytest
+
+from freeciv.secfile import ColumnTable, DescentParser, SectionIndex, SpecParser
+
+MAIN = """; Comment
+[first]
+value = 1
+text = "multi
+[line]"
+
+  [second]
+value = _("Ünïcödé")
+*include "nations.spec"
+[last]
+table = { "a", "b"
+  1, 2
+}
+"""
+
+
+@pytest.fixture
+def data(tmp_path):
+    (tmp_path / "main.spec").write_text(MAIN, encoding="utf-8")
+    (tmp_path / "nations.spec").write_text(
+        "[nation_a]\nname = 1\n[nation_b]\nname = 2\n"
+    )
+    return tmp_path
+
+
+@pytest.mark.parametrize("parser", [SpecParser, DescentParser])
+def test_load_section(data, parser):
+    expected = {section.name: section for section in parser.load("main.spec", [data])}
+    for name in ("first", "second", "nation_a", "nation_b", "last"):
+        section = parser.load_section("main.spec", [data], name)
+        assert section == expected[name]
+        assert section.name == name
+    assert (data / "main.spec.idx").exists()
+
+    with pytest.raises(KeyError):
+        parser.load_section("main.spec", [data], "missing")
+
+
+def test_index(data):
+    index = SectionIndex.build("main.spec", [data])
+    # The text search used to skip sections sees the string as a header
+    names = [entry.name for entry in index.entries]
+    assert names == ["first", "line", "second", "nation_a", "nation_b", "last"]
+    raw = (data / "main.spec").read_bytes()
+    entry = index.find("last")
+    assert raw[entry.offset :].startswith(b"[last]")
+    assert entry.lineno == 10
+
+    # Changing an included file makes the index stale
+    index = SectionIndex.load("main.spec", [data])
+    assert index.is_fresh()
+    (data / "nations.spec").write_text("[nation_c]\nname = 3\n")
+    assert not index.is_fresh()
+    assert SpecParser.load_section("main.spec", [data], "nation_c") == {"name": 3}
+
+
+def test_compressed(tmp_path):
+    with gzip.open(tmp_path / "main.spec", "wt") as f:
+        f.write("[a]\nvalue = 1\n[b]\nvalue = 2\n")
+    assert SpecParser.load_section("main.spec", [tmp_path], "b") == {"value": 2}
+    assert SectionIndex.load("main.spec", [tmp_path]).find("b").offset is None
+
+
+@pytest.mark.parametrize(
+    "options", [{"scanner": "ply"}, {"scanner": "regex", "memory_map": True}]
+)
+def test_load_section_options(data, options):
+    # The options of the caller are used to parse the section
+    section = SpecParser.load_section("main.spec", [data], "last", **options)
+    assert section == {"table": [{"a": 1, "b": 2}]}
+    section = SpecParser.load_section(
+        "main.spec", [data], "last", columnar=True, **options
+    )
+    assert isinstance(section["table"], ColumnTable)
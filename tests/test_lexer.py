@@ -16,3 +16,78 @@ def test_multiline(tmp_path):
     assert tok is not None
     assert tok.type == "STRING_LITERAL"
     assert tok.value == "a\\\n b \\\nc"
+
+
+def test_include_reuses_lexer(tmp_path, monkeypatch):
+    import freeciv.secfile.lexer
+
+    (tmp_path / "main.spec").write_text('*include "a.spec"\n*include "b.spec"\n')
+    (tmp_path / "a.spec").write_text("a = 1\n")
+    (tmp_path / "b.spec").write_text("b = 2\n")
+
+    built = []
+
+    def counting_lex(*args, **kwargs):
+        built.append(kwargs["module"])
+        return lex(*args, **kwargs)
+
+    lex = freeciv.secfile.lexer.lex
+    monkeypatch.setattr(freeciv.secfile.lexer, "lex", counting_lex)
+    monkeypatch.setattr(SpecLexer, "_template", None, raising=False)
+
+    lexer = SpecLexer("main.spec", [tmp_path])
+    values = []
+    while tok := lexer.token():
+        if tok.type == "IDENTIFIER":
+            values.append(tok.value)
+    assert values == ["a", "b"]
+    assert len(built) == 1
+    assert built[0] is not lexer
+
+
+def test_include_cache(tmp_path):
+    from freeciv.secfile import SpecParser, include_cache
+
+    (tmp_path / "main.spec").write_text('*include "shared.spec"\n')
+    shared = tmp_path / "shared.spec"
+    shared.write_text("[a]\nvalue = 1\n[b]\nvalue = 2\n")
+
+    include_cache.clear()
+    first = SpecParser.load("main.spec", [tmp_path])
+    assert include_cache.cache_info()[:2] == (0, 1)
+
+    second = SpecParser.load("main.spec", [tmp_path], scanner="regex")
+    assert second == first
+    assert include_cache.cache_info()[:2] == (1, 1)
+
+    # Skipping sections works on cached tokens
+    selected = SpecParser.load("main.spec", [tmp_path], sections="b")
+    assert selected == [{"value": 2}]
+    assert selected[0].name == "b"
+
+    # Modified files are read again
+    shared.write_text("[a]\nvalue = 10\n")
+    assert SpecParser.load("main.spec", [tmp_path]) == [{"value": 10}]
+    assert include_cache.cache_info()[:2] == (2, 2)
+
+
+def test_include_cache_data_path(tmp_path):
+    from freeciv.secfile import SpecParser, include_cache
+
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    (shared / "inc.spec").write_text("[a]\nhelp = *help.txt*\n")
+    for name in ("r1", "r2"):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "main.spec").write_text('*include "inc.spec"\n')
+        (tmp_path / name / "help.txt").write_text(f"Help for {name}")
+
+    include_cache.clear()
+    for name in ("r1", "r2", "r1"):
+        sections = SpecParser.load("main.spec", [tmp_path / name, shared])
+        assert sections == [{"help": f"Help for {name}"}]
+    assert include_cache.cache_info()[:2] == (0, 3)
+
+    # The cache is still used when the names lead to the same files
+    SpecParser.load("main.spec", [tmp_path / "r1", shared, tmp_path])
+    assert include_cache.cache_info()[:2] == (1, 3)
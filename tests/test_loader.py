@@ -0,0 +1,240 @@
+from dataclasses import dataclass, field
+from typing import Literal, Union
+
+import pytest
+
+import freeciv.secfile.loader
+from freeciv.effects import Effect, Requirement
+from freeciv.secfile import (
+    Section,
+    SectionRouter,
+    SpecParser,
+    read_section,
+    read_sections,
+    set_trusted,
+    validate,
+    validating,
+)
+from freeciv.secfile.loader import (
+    NamedReference,
+    TypeCheckError,
+    rename,
+    section,
+    typechecked,
+)
+
+RULESET = """
+[item_a]
+name = "A"
+count = 3
+tags = "x", "y"
+parts = { "kind", "size"
+  "wheel", 4
+  "door", 2
+}
+
+[item_b]
+name = "B"
+kind = "other"
+tags = "x"
+
+[extra]
+name = "ignored"
+"""
+
+
+@typechecked
+@dataclass
+class Part:
+    kind: str
+    size: int = 1
+
+
+@rename(kind="category")
+@section("item_.+")
+@typechecked
+@dataclass
+class Item:
+    name: str
+    count: int = 1
+    category: str = "default"
+    owner: NamedReference("Item") = None
+    tags: set[str] = field(default_factory=set)
+    parts: list[Part] = field(default_factory=list)
+
+
+@pytest.mark.parametrize("options", [{}, {"columnar": True}, {"compact": True}])
+def test_read_sections(tmp_path, options):
+    (tmp_path / "items.ruleset").write_text(RULESET)
+    sections = SpecParser.load("items.ruleset", [tmp_path], **options)
+
+    assert read_sections(Item, sections) == [
+        Item("A", 3, tags={"x", "y"}, parts=[Part("wheel", 4), Part("door", 2)]),
+        Item("B", category="other", tags={"x"}),
+    ]
+
+
+def test_compiled_once(monkeypatch):
+    calls = []
+    get_type_hints = freeciv.secfile.loader.get_type_hints
+
+    def counting_get_type_hints(cls):
+        calls.append(cls)
+        return get_type_hints(cls)
+
+    monkeypatch.setattr(freeciv.secfile.loader, "_converters", {})
+    monkeypatch.setattr(
+        freeciv.secfile.loader, "get_type_hints", counting_get_type_hints
+    )
+    sections = []
+    for i in range(10):
+        sections.append(Section(f"effect_{i}"))
+        sections[-1].update(
+            name="Output_Bonus",
+            value=i,
+            reqs=[{"type": "Gov", "name": "Anarchy", "range": "Player"}],
+        )
+
+    effects = read_sections(Effect, sections)
+    assert [effect.value for effect in effects] == list(range(10))
+    assert effects[0].reqs == [Requirement("Gov", "Anarchy", "Player")]
+    assert calls == [Effect, Requirement]
+
+
+def test_errors():
+    item = Section("item_c")
+    item.update(name="C", unknown=1)
+    with pytest.raises(ValueError, match='no field called "unknown"'):
+        read_sections(Item, [item])
+    with pytest.raises(ValueError, match="No section"):
+        read_section(Item, [])
+
+
+@section("range")
+@typechecked
+@dataclass
+class Range:
+    max_range: Union[int, Literal["unlimited"]] = 1
+    anything: object = None
+
+
+def test_dispatch(monkeypatch):
+    check_type = freeciv.secfile.loader.check_type
+    checked = []
+
+    def counting_check_type(*args):
+        checked.append(args)
+        return check_type(*args)
+
+    monkeypatch.setattr(freeciv.secfile.loader, "_converters", {})
+    monkeypatch.setattr(freeciv.secfile.loader, "check_type", counting_check_type)
+
+    item = Section("item_a")
+    item.update(name="A", parts=[{"kind": "wheel"}, Part("door")])
+    assert read_section(Item, [item]).parts == [Part("wheel"), Part("door")]
+    # Typeguard is only used for types that cannot be converted to
+    assert checked == []
+
+    section = Section("range")
+    section.update(max_range="unlimited", anything=[1])
+    assert read_section(Range, [section]) == Range("unlimited", [1])
+    assert len(checked) == 1
+
+    section = Section("range")
+    section.update(max_range="far")
+    with pytest.raises(TypeCheckError):
+        read_section(Range, [section])
+
+
+@section("checked")
+@typechecked
+class Checked:
+    value: str
+
+    def __init__(self, value: int):
+        self.value = value
+
+
+def test_trusted():
+    section = Section("checked")
+    section.update(value="a")
+    with pytest.raises(TypeCheckError):
+        read_section(Checked, [section])
+    try:
+        set_trusted(True)
+        assert read_section(Checked, [section]).value == "a"
+        # Only the loader skips the checks
+        with pytest.raises(TypeCheckError):
+            Checked("a")
+    finally:
+        set_trusted(False)
+    with pytest.raises(TypeCheckError):
+        read_section(Checked, [section])
+
+
+def test_validating():
+    def item(**values):
+        section = Section("item_a")
+        section.update(values)
+        return [section]
+
+    bad_name = item(name=1)
+    bad_part = item(name="A", parts=[{"kind": "wheel", "size": True}])
+    good = item(name="A", parts={"kind": "wheel", "size": 3}, tags=["x", "y"])
+
+    # Values are converted when not validating
+    assert read_section(Item, bad_name).name == "1"
+
+    with validating():
+        with pytest.raises(TypeCheckError, match="Item.name"):
+            read_section(Item, bad_name)
+        with pytest.raises(TypeCheckError, match="Part.size"):
+            read_section(Item, bad_part)
+        assert read_section(Item, good) == Item(
+            "A", parts=[Part("wheel", 3)], tags={"x", "y"}
+        )
+
+
+def test_validate(tmp_path):
+    (tmp_path / "items.ruleset").write_text(RULESET)
+    items = read_sections(Item, SpecParser.load("items.ruleset", [tmp_path]))
+    validate(items)
+
+    items[0].owner = items[1]
+    validate(items)
+    items[1].tags = ["x"]
+    with pytest.raises(TypeCheckError, match="Item.tags"):
+        validate(items)
+    items[1].tags = {"x"}
+    items[0].parts[1].size = "2"
+    with pytest.raises(TypeCheckError, match="Part.size"):
+        validate(items[0])
+
+
+@section("item_b")
+@dataclass
+class SpecialItem:
+    name: str
+    kind: str
+    tags: str
+
+
+def test_router(tmp_path):
+    (tmp_path / "items.ruleset").write_text(RULESET)
+    sections = SpecParser.load("items.ruleset", [tmp_path])
+
+    routed = SectionRouter([Range, Item]).route(sections)
+    assert routed.sections(Range) == []
+    assert routed.read_sections(Item) == read_sections(Item, sections)
+    assert routed.read_section(Range, missing_ok=True) is None
+    with pytest.raises(ValueError, match="Several sections"):
+        routed.read_section(Item)
+
+    with pytest.raises(ValueError, match="matches both Item and SpecialItem"):
+        SectionRouter([Item, SpecialItem]).route(sections)
+
+    # Rewriting functions modify the sections
+    sections = SpecParser.load("items.ruleset", [tmp_path])
+    routed = SectionRouter([SpecialItem, Item], first_match=True).route(sections)
+    assert routed.read_section(SpecialItem) == SpecialItem("B", "other", "x")
+    assert [item.name for item in routed.read_sections(Item)] == ["A"]
@@ -1,6 +1,6 @@
 import pytest
 
-from freeciv.secfile import Section, SpecParser
+from freeciv.secfile import DescentParser, Section, SpecParser
 
 MULTILINE_TEST = r"""
 [test]
@@ -19,3 +19,143 @@ def test_multiline(tmp_path):
     assert isinstance(sections[0], Section)
     assert "str" in sections[0]
     assert sections[0]["str"] == "a b c"
+
+
+def test_tables_built_once(tmp_path, monkeypatch):
+    import ply.yacc
+
+    (tmp_path / "a.spec").write_text("[a]\nx = 1\n")
+    (tmp_path / "b.spec").write_text("[b]\ny = 2\n")
+
+    built = []
+    yacc = ply.yacc.yacc
+
+    def counting_yacc(*args, **kwargs):
+        built.append(kwargs)
+        return yacc(*args, **kwargs)
+
+    monkeypatch.setattr(ply.yacc, "yacc", counting_yacc)
+    monkeypatch.setattr(SpecParser, "_yacc_template", None, raising=False)
+    monkeypatch.chdir(tmp_path)
+
+    assert SpecParser.load("a.spec", [tmp_path]) == [{"x": 1}]
+    assert SpecParser.load("b.spec", [tmp_path]) == [{"y": 2}]
+    assert len(built) == 1
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.spec", "b.spec"]
+
+
+def test_streaming(tmp_path):
+    # The second section cannot be lexed, but it is never reached
+    (tmp_path / "stream.spec").write_text("[datafile]\nversion = 3\n\n[map]\nt = @\n")
+
+    sections = iter(SpecParser("stream.spec", [tmp_path]))
+    assert next(sections) == {"version": 3}
+
+
+SELECTIVE_TEST = """
+[unit_a]
+name = "A"
+[other]
+help = "Not parsed"
+*include "included.spec"
+[unit_c]
+name = "C"
+"""
+
+
+@pytest.mark.parametrize("scanner", ["ply", "regex"])
+def test_selective(tmp_path, scanner):
+    (tmp_path / "selective.spec").write_text(SELECTIVE_TEST)
+    (tmp_path / "included.spec").write_text('[unit_b]\nname = "B"\n[skip]\nx = 1\n')
+
+    sections = SpecParser.load(
+        "selective.spec", [tmp_path], scanner=scanner, sections="unit_.+"
+    )
+    assert [s.name for s in sections] == ["unit_a", "unit_b", "unit_c"]
+    assert [s["name"] for s in sections] == ["A", "B", "C"]
+
+    sections = SpecParser.load(
+        "selective.spec", [tmp_path], scanner=scanner, sections=lambda n: n == "skip"
+    )
+    assert sections == [{"x": 1}]
+
+
+@pytest.mark.parametrize(
+    "parser, scanner",
+    [(SpecParser, "ply"), (SpecParser, "regex"), (DescentParser, "regex")],
+)
+def test_selective_include(tmp_path, parser, scanner):
+    (tmp_path / "test.spec").write_text(
+        '[keep]\na = 1\n[skip]\nb = 2\n*include "inc.spec"\nc = 3\n[other]\nd = 4\n'
+    )
+    (tmp_path / "inc.spec").write_text("x = 5\n")
+
+    sections = parser.load("test.spec", [tmp_path], scanner=scanner, sections="keep")
+    assert sections == [{"a": 1}]
+
+    sections = parser.load(
+        "test.spec", [tmp_path], scanner=scanner, sections="keep|other"
+    )
+    assert sections == [{"a": 1}, {"d": 4}]
+
+
+def test_long_list(tmp_path):
+    # Quadratic list building would make this take minutes
+    count = 50_000
+    (tmp_path / "list.spec").write_text(
+        "[vector]\nvalues = " + ", ".join(["1"] * count) + "\n"
+    )
+
+    (section,) = SpecParser.load("list.spec", [tmp_path], scanner="regex")
+    assert section["values"] == [1] * count
+
+
+def test_disk_cache(tmp_path, monkeypatch):
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "main.spec").write_text('[main]\nhelp = *help.txt*\n*include "inc.spec"\n')
+    (data / "inc.spec").write_text('[inc]\nvalue = "a"\n')
+    (data / "help.txt").write_text("Help")
+    cache_dir = tmp_path / "cache"
+
+    def load():
+        return SpecParser.load("main.spec", [data], cache_dir=cache_dir)
+
+    first = load()
+    assert first == [{"help": "Help"}, {"value": "a"}]
+    assert [section.name for section in first] == ["main", "inc"]
+
+    parsed = []
+    get_all = SpecParser.get_all
+
+    def counting_get_all(self):
+        parsed.append(self)
+        return get_all(self)
+
+    monkeypatch.setattr(SpecParser, "get_all", counting_get_all)
+
+    assert load() == first
+    assert not parsed
+
+    # Any file read while parsing invalidates the entry
+    (data / "inc.spec").write_text('[inc]\nvalue = "b"\n')
+    assert load()[1] == {"value": "b"}
+    (data / "help.txt").write_text("More help")
+    assert load()[0] == {"help": "More help"}
+    assert len(parsed) == 2
+    assert load()[0] == {"help": "More help"}
+    assert len(parsed) == 2
+
+
+@pytest.mark.parametrize("scanner", ["ply", "regex"])
+def test_interning(tmp_path, scanner):
+    (tmp_path / "test.spec").write_text(
+        '[a]\nkind = "Land"\nu = { "type", "name"\n"Land", "City 1"\n}\n'
+        '[b]\nkind = "Land"\nu = { "type", "name"\n"Land", "City 1"\n}\n'
+    )
+    a, b = SpecParser.load("test.spec", [tmp_path], scanner=scanner)
+    key_a, key_b = next(iter(a)), next(iter(b))
+    assert key_a is key_b
+    assert a["kind"] is b["kind"]
+    column_a, column_b = next(iter(a["u"][0])), next(iter(b["u"][0]))
+    assert column_a is column_b
@@ -0,0 +1,64 @@
+import pickle
+
+import pytest
+
+from freeciv.effects import Effect, Requirement
+from freeciv.rules import Ruleset
+from freeciv.secfile import validate
+from freeciv.units import UnitClass, UnitType
+
+
+@pytest.fixture
+def units():
+    land = UnitClass("Land", 1, 0)
+    warriors = UnitType(
+        name="Warriors",
+        uclass="Land",
+        tech_req={"None"},
+        graphic="u.warriors",
+        graphic_alt="-",
+        sound_move="m_warriors",
+        sound_move_alt="m_generic",
+        sound_fight="f_warriors",
+        sound_fight_alt="f_generic",
+        build_cost=10,
+        pop_cost=0,
+        attack=1,
+        defense=1,
+        hitpoints=10,
+        firepower=1,
+        move_rate=1,
+        vision_radius_sq=2,
+        transport_cap=0,
+        fuel=0,
+        uk_happy=1,
+        uk_shield=1,
+        uk_food=0,
+        uk_gold=0,
+        targets={"Land"},
+    )
+    return land, warriors
+
+
+def test_slots(units):
+    land, warriors = units
+    requirement = Requirement("Gov", "Anarchy", "Player", negated=True)
+    for obj in (land, warriors, requirement, Effect(1, type="Output_Bonus")):
+        assert not hasattr(obj, "__dict__")
+    assert requirement.present is False
+    assert requirement.negated is None
+    assert pickle.loads(pickle.dumps(warriors)) == warriors
+
+
+def test_link(units):
+    land, warriors = units
+    ruleset = Ruleset.__new__(Ruleset)
+    ruleset._collections = {
+        "UnitClass": {"Land": land},
+        "UnitType": {"Warriors": warriors},
+    }
+    ruleset._link(warriors)
+    assert warriors.uclass is land
+    assert warriors.targets == {land}
+    # References to objects are valid
+    validate(warriors)
@@ -0,0 +1,104 @@
+import gzip
+import mmap
+
+import pytest
+from ply.lex import LexError
+
+import freeciv.secfile.scanner
+from freeciv.secfile import SpecLexer, SpecParser, include_cache
+from freeciv.secfile.scanner import StreamScanner
+
+CONFORMANCE_TESTS = {
+    "empty": "",
+    "section": "[section]\n[another one]\n",
+    "assignments": '[a]\nname = "value"\nnum = -12, 0, 34\nflag = TRUE, false\n',
+    "strings": r"""
+[s]
+plain = "a \"quoted\" string", ""
+gettext = _("Translated"), _("")
+raw = $raw text$, $$
+domain = "?gender:male"
+""",
+    "multiline": r"""[m]
+text = _("line one\
+line two
+line three")
+after = 1
+""",
+    "comments": "; comment\n# another\n[c] ; trailing\nx = 1 # trailing\n",
+    "qualified": "[q]\na.b.c = 1\n",
+    "table": '[t]\nreqs =\n    { "type", "name"\n      "Tech", "Alphabet"\n    }\n',
+    "whitespace": "\t[w]  \r\n  x\t=\t1   \n\n\n",
+    "file string": "[f]\nhelp = *data.txt*\n",
+    "include": '[i]\n*include "inc.spec"\ny = 2\n',
+    "unicode": '[nation_ivorian]\nname = _("Côte d’Ivoire")\nplural = "日本"\n',
+}
+
+
+def tokens(lexer):
+    result = []
+    while tok := lexer.token():
+        result.append((tok.type, tok.value, tok.lineno))
+    return result
+
+
+@pytest.mark.parametrize("text", CONFORMANCE_TESTS.values(), ids=CONFORMANCE_TESTS)
+def test_conformance(tmp_path, monkeypatch, text):
+    (tmp_path / "test.spec").write_text(text)
+    (tmp_path / "data.txt").write_text("From\nfile")
+    (tmp_path / "inc.spec").write_text("x = 1\n")
+    # Included files must be scanned by every backend, not replayed
+    monkeypatch.setattr(include_cache, "maxsize", 0)
+
+    expected = tokens(SpecLexer("test.spec", [tmp_path], scanner="ply"))
+    assert tokens(SpecLexer("test.spec", [tmp_path], scanner="regex")) == expected
+    lexer = SpecLexer("test.spec", [tmp_path], scanner="regex", memory_map=True)
+    assert tokens(lexer) == expected
+
+    # Tiny chunks to test tokens cut at chunk boundaries
+    with gzip.open(tmp_path / "test.spec.gz", "wt", encoding="utf-8") as f:
+        f.write(text)
+    monkeypatch.setattr(StreamScanner, "chunk_size", 3)
+    lexer = SpecLexer("test.spec.gz", [tmp_path], scanner="regex")
+    assert tokens(lexer) == expected
+
+    if expected:
+        expected = SpecParser.load("test.spec", [tmp_path], scanner="ply")
+        assert SpecParser.load("test.spec", [tmp_path], scanner="regex") == expected
+
+
+def test_illegal_character(tmp_path):
+    (tmp_path / "test.spec").write_text("[a]\nx = @\n")
+
+    for options in ({}, {"scanner": "regex"}, {"scanner": "regex", "memory_map": True}):
+        lexer = SpecLexer("test.spec", [tmp_path], **options)
+        with pytest.raises(LexError, match="Illegal character '@'"):
+            tokens(lexer)
+
+
+def test_memory_map(tmp_path, monkeypatch):
+    (tmp_path / "test.spec").write_text("; comment\n[a]\nx = 1  # trailing\n[b]\n")
+    decoded = []
+    decode = freeciv.secfile.scanner._decode
+
+    def counting_decode(value):
+        decoded.append(value)
+        return decode(value)
+
+    monkeypatch.setattr(freeciv.secfile.scanner, "_decode", counting_decode)
+
+    # Only the values of the tokens are decoded, and the map is closed at the end
+    lexer = SpecLexer("test.spec", [tmp_path], scanner="regex", memory_map=True)
+    scanner = lexer._current_lexer()
+    assert isinstance(scanner.lexdata, mmap.mmap)
+    expected = tokens(SpecLexer("test.spec", [tmp_path]))
+    assert tokens(lexer) == expected
+    assert len(decoded) == len(expected)
+    assert scanner.lexdata == b""
+
+    # Also when parsing stops early
+    parser = SpecParser("test.spec", [tmp_path], scanner="regex", memory_map=True)
+    data = parser._current_lexer().lexdata
+    for section in parser:
+        break
+    assert data.closed
@@ -0,0 +1,68 @@
+from array import array
+from dataclasses import dataclass
+
+import pytest
+
+from freeciv.secfile import ColumnTable, DescentParser, SpecParser
+from freeciv.secfile.loader import read_section, section
+
+TABLES = """
+[units]
+u = { "x", "y", "type", "done"
+  1, 2, "Warriors", FALSE
+  3, 4, "Settlers", TRUE
+}
+single = { "name"
+  "a"
+  "b"
+}
+ragged = { "a", "b"
+  1, 2, 3
+  4, 5
+}
+empty = { "a", "b" }
+"""
+
+
+@section("units")
+@dataclass
+class Units:
+    u: list[dict]
+    single: list[dict]
+    ragged: list[dict]
+    empty: list[dict]
+
+
+@pytest.fixture
+def data(tmp_path):
+    (tmp_path / "test.spec").write_text(TABLES)
+    return tmp_path
+
+
+@pytest.mark.parametrize("parser", [SpecParser, DescentParser])
+def test_columnar(data, parser):
+    (rows,) = parser.load("test.spec", [data])
+    (columns,) = parser.load("test.spec", [data], columnar=True)
+    assert columns == rows
+
+    table = columns["u"]
+    assert isinstance(table, ColumnTable)
+    assert table.names == ("x", "y", "type", "done")
+    assert table.column("x") == array("q", [1, 3])
+    assert table.column("done") == [False, True]
+    assert len(table) == 2
+    assert table[-1] == {"x": 3, "y": 4, "type": "Settlers", "done": True}
+    assert table[1:] == [table[1]]
+    assert [row["type"] for row in table] == ["Warriors", "Settlers"]
+
+    assert columns["single"].column("name") == ["a", "b"]
+    # Rows with missing values are kept as a list
+    assert type(columns["ragged"]) is list
+    assert len(columns["empty"]) == 0
+
+
+def test_loader(data):
+    sections = SpecParser.load("test.spec", [data], columnar=True)
+    units = read_section(Units, sections)
+    assert units.u[1] == {"x": 3, "y": 4, "type": "Settlers", "done": True}
+    assert units.single == [{"name": "a"}, {"name": "b"}]
@@ -0,0 +1,53 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from freeciv.secfile import DataPath, DescentParser, SpecParser, include_cache, parse
+
+FILES = 24
+
+
+@pytest.fixture
+def data(tmp_path):
+    (tmp_path / "shared.spec").write_text(
+        '[shared]\nnames = "a", "b", "c"\nhelp = *help.txt*\n'
+    )
+    (tmp_path / "help.txt").write_text("Help")
+    for i in range(FILES):
+        rows = "".join(
+            f'{j}, "Unit {j}", {"TRUE" if j % 2 else "FALSE"}\n' for j in range(50)
+        )
+        (tmp_path / f"file{i}.spec").write_text(
+            f'[file_{i}]\nvalue = {i}\nsub.name = _("File {i}")\n'
+            f'u = {{ "id", "name", "done"\n{rows}}}\n'
+            '*include "shared.spec"\n'
+        )
+    return tmp_path
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"scanner": "regex"},
+        {"parser_class": DescentParser, "scanner": "regex", "compact": True},
+        {"sections": "file_"},
+    ],
+)
+def test_parallel(data, options, monkeypatch):
+    path = DataPath([data])
+    names = [f"file{i % FILES}.spec" for i in range(2 * FILES)]
+    include_cache.clear()
+
+    # Build the shared tables in parallel too
+    monkeypatch.setattr(SpecParser, "_template", None, raising=False)
+    monkeypatch.setattr(SpecParser, "_yacc_template", None, raising=False)
+    monkeypatch.setattr(DescentParser, "_template", None, raising=False)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        parallel = list(executor.map(lambda name: parse(name, path, **options), names))
+
+    serial = [parse(name, path, **options) for name in names]
+    assert parallel == serial
+    assert all(
+        len(sections) == (1 if "sections" in options else 2) for sections in serial
+    )
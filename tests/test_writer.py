@@ -0,0 +1,150 @@
+import gzip
+import io
+
+import pytest
+
+from freeciv.secfile import DescentParser, Section, SpecParser, SpecWriter
+
+RULESET = r"""
+[datafile]
+description = "Test ruleset"
+options = "+Freeciv-ruleset-3.1-Devel-2022.Feb.02"
+
+[building_palace]
+name = _("Palace")
+reqs =
+    { "type", "name", "range"
+      "Building", "Palace", "Player"
+      "Gov", "Despotism", "Player"
+    }
+flags = "SaveSmallWonder", "Visible"
+build_cost = 70
+obsolete_by = { "type" }
+helptext = _("\
+A line.\n\
+Another line with a \"quote\".\
+")
+sound.first = "b_palace"
+sound.alt.name = "-"
+single = { "name"
+  "a"
+  "b"
+}
+
+[building_barracks]
+name = "Barracks"
+sabotage = -10
+replaced = FALSE
+"""
+
+STRINGS = [
+    "",
+    "plain",
+    'a "quoted" word',
+    "back\\slash",
+    "ends with a backslash\\",
+    "\\",
+    'ends with an escaped quote\\"',
+    "line\nbreak",
+    "?domain:not a domain",
+    "$dollar$",
+    "*not a file*",
+    "; not a comment",
+]
+
+
+def write(sections):
+    buffer = io.StringIO()
+    SpecWriter(buffer).write_all(sections)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("parser", [SpecParser, DescentParser])
+@pytest.mark.parametrize("options", [{}, {"columnar": True}, {"compact": True}])
+def test_round_trip(tmp_path, parser, options):
+    (tmp_path / "test.ruleset").write_text(RULESET)
+    sections = parser.load("test.ruleset", [tmp_path], **options)
+
+    with SpecWriter(tmp_path / "out.ruleset") as writer:
+        writer.write_all(sections)
+
+    expected = SpecParser.load("test.ruleset", [tmp_path])
+    assert parser.load("out.ruleset", [tmp_path], **options) == sections
+    assert SpecParser.load("out.ruleset", [tmp_path]) == expected
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"scanner": "ply"},
+        {"scanner": "regex"},
+        {"scanner": "regex", "memory_map": True},
+    ],
+)
+def test_strings(tmp_path, options):
+    section = Section("strings")
+    for i, value in enumerate(STRINGS):
+        section[f"s{i}"] = value
+    section["all"] = STRINGS
+    section["table"] = [{"a": value, "b": i} for i, value in enumerate(STRINGS)]
+    (tmp_path / "out.spec").write_text(write([section]))
+
+    assert SpecParser.load("out.spec", [tmp_path], **options) == [section]
+
+
+def test_compressed(tmp_path):
+    (tmp_path / "test.ruleset").write_text(RULESET)
+    sections = SpecParser.load("test.ruleset", [tmp_path])
+
+    with SpecWriter(tmp_path / "out.sav.gz") as writer:
+        for section in sections:
+            writer.write_section(section)
+
+    with gzip.open(tmp_path / "out.sav.gz", "rt") as f:
+        assert f.read() == write(sections)
+    assert SpecParser.load("out.sav.gz", [tmp_path]) == sections
+
+
+def test_format():
+    section = Section("game")
+    section["turn"] = 3
+    section[("a", "b")] = True
+    section["names"] = ["x", "y"]
+    section["empty"] = []
+    section["units"] = [{"x": 1, "y": 2}, {"x": 3, "y": 4}]
+    assert write([section, Section("other")]) == (
+        "[game]\n"
+        "turn = 3\n"
+        "a.b = TRUE\n"
+        'names = "x", "y"\n'
+        'empty = { "" }\n'
+        'units = { "x", "y"\n'
+        "  1, 2\n"
+        "  3, 4\n"
+        "}\n"
+        "\n"
+        "[other]\n"
+    )
+
+
+@pytest.mark.parametrize(
+    "name, value",
+    [
+        ("1st", 1),
+        ("true", 1),
+        ("a-b", 1),
+        ("value", 1.5),
+        ("value", None),
+        ("value", [[1, 2]]),
+        ("value", [{"a": 1}, {"b": 2}]),
+        ("value", [{'"': 1}]),
+        ("value", "a\rb"),
+        ("value", "a\r\nb"),
+        ("value", [{"a\rb": 1}]),
+    ],
+)
+def test_errors(name, value):
+    section = Section("bad")
+    section[name] = value
+    with pytest.raises(ValueError):
+        write([section])